@@ -0,0 +1,344 @@
+# ===============================================================
+# Isekai Online - Server Hot-Path Benchmarks
+# ===============================================================
+# Times the server's hot paths (combat, skills, spawning, biome
+# lookups, player serialization, saves) at several enemy / player
+# counts and writes results as JSON so runs can be diffed across
+# versions.
+#
+# Examples:
+#   python benchmark.py --json before.json
+#   python benchmark.py --json after.json --compare before.json
+#   python benchmark.py --quick --filter skill
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.abspath(__file__))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+from shared.biome import get_biome, is_safe_spawn, biome_region
+from server import player as player_module
+from server.player import PlayerManager
+from server.enemies import EnemyManager
+from server.combat_enhanced import EnhancedCombatSystem
+from server.skills import SkillManager
+from server.enemy_ai import EnemyAI
+from server.world import spawn_table
+from server.database import Database
+from server.persistence import PlayerPersistence
+
+# Config constants
+CITY = cfg.CITY
+
+SKILLS = ("PowerStrike", "Fireball", "HealLight", "ShadowStep", "WindSlash")
+ENEMY_COUNTS = (100, 1000, 5000)
+PLAYER_COUNTS = (10, 100, 1000)
+QUICK_ENEMY_COUNTS = (100, 1000)
+QUICK_PLAYER_COUNTS = (10, 100)
+
+# Grasslands spot west of the castle, where most enemies spawn
+HUNT_SPOT = (CITY["x"] - 150, CITY["y"] + CITY["h"] // 2)
+
+
+# -----------------------------------------------------------
+# Timing
+# -----------------------------------------------------------
+def measure(fn, repeat=5, min_time=0.1):
+    """Best/median seconds per call, auto-scaling the loop count."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 24:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    runs = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - start) / loops)
+    return min(runs), statistics.median(runs), loops
+
+
+# -----------------------------------------------------------
+# World setup
+# -----------------------------------------------------------
+def make_enemies(n):
+    """EnemyManager with (up to) n enemies spawned through the normal path."""
+    random.seed(1234)
+    em = EnemyManager()
+    em.respawns.delay = 0  # kills are replaced by the next respawns.step()
+    attempts = 0
+    while len(em.enemies) < n and attempts < n * 4:
+        em.spawn_enemy()
+        attempts += 1
+    em.commit_delta()
+    return em
+
+
+def make_players(n, class_name="warrior"):
+    pm = PlayerManager()
+    for _ in range(n):
+        pm.create_player(class_name)
+    return pm
+
+
+def hunter(pm, class_name):
+    """A player standing in the middle of the enemy zone."""
+    p = pm.create_player(class_name)
+    p.x, p.y = HUNT_SPOT
+    return p
+
+
+# -----------------------------------------------------------
+# Cases: each returns (callable, batch size, extra params)
+# -----------------------------------------------------------
+def case_player_attack(enemies):
+    em = make_enemies(enemies)
+    pm = PlayerManager()
+    p = hunter(pm, "warrior")
+    combat = EnhancedCombatSystem(pm, em)
+
+    def run():
+        p.x, p.y = HUNT_SPOT
+        combat.player_attack(p.id)
+        em.respawns.step()
+    return run, 1, {"enemies_actual": len(em.enemies)}
+
+
+def case_skill(skill, enemies):
+    em = make_enemies(enemies)
+    pm = PlayerManager()
+    p = hunter(pm, "warrior")
+    sm = SkillManager(pm, em, clock=itertools.count(step=1000).__next__)  # never on cooldown
+
+    def run():
+        p.x, p.y = HUNT_SPOT  # ShadowStep moves the caster
+        sm.use_skill(p.id, skill)
+        em.respawns.step()
+    return run, 1, {"enemies_actual": len(em.enemies)}
+
+
+def case_spawn_enemy(enemies):
+    em = make_enemies(enemies)
+
+    def run():
+        eid = em.spawn_enemy()
+        if eid is not None:
+            em.remove_enemy(eid)  # keep the population constant
+    return run, 1, {"enemies_actual": len(em.enemies)}
+
+
+def case_enemy_ai(enemies, players=50):
+    """One AI tick with a group of players hunting in the enemy zone."""
+    em = make_enemies(enemies)
+    pm = PlayerManager()
+    rng = random.Random(7)
+    for _ in range(players):
+        p = pm.create_player("warrior")
+        p.x, p.y = HUNT_SPOT[0] + rng.uniform(-300, 300), HUNT_SPOT[1] + rng.uniform(-300, 300)
+    ai = EnemyAI(em)
+
+    def run():
+        ai.step(pm.players)
+        em.commit_delta()
+    return run, 1, {"enemies_actual": len(em.enemies), "players": players}
+
+
+def _points(n=1000):
+    rng = random.Random(42)
+    return [(rng.uniform(0, 3000), rng.uniform(0, 3000)) for _ in range(n)]
+
+
+def case_get_biome():
+    pts = _points()
+
+    def run():
+        for x, y in pts:
+            get_biome(x, y)
+    return run, len(pts), {}
+
+
+def case_is_safe_spawn():
+    pts = _points()
+
+    def run():
+        for x, y in pts:
+            is_safe_spawn(x, y)
+    return run, len(pts), {}
+
+
+def case_spawn_pick():
+    table = spawn_table(200, 200, 2800, 2800)
+
+    def run():
+        for _ in range(1000):
+            table.pick()
+    return run, 1000, {"tiles": len(table)}
+
+
+def case_biome_region():
+    def run():
+        biome_region(10, 10, 64, 64)
+    return run, 64 * 64, {}
+
+
+def case_serialize():
+    pm = make_players(1)
+    p = next(iter(pm.players.values()))
+    return p.serialize, 1, {}
+
+
+def case_get_state(players):
+    pm = make_players(players)
+    return pm.get_state, 1, {}
+
+
+def case_save_player(db):
+    data = {"class": "mage", "lvl": 7, "xp": 40, "hp": 90, "max_hp": 110}
+    ids = [f"b{i:03d}" for i in range(100)]
+    it = iter(range(1 << 62))
+
+    def run():
+        db.save_player(ids[next(it) % 100], data)
+    return run, 1, {}
+
+
+def case_save_players(db, batch):
+    rows = [(f"s{i:04d}", {"class": "rogue", "lvl": 3, "xp": i % 100, "hp": 80, "max_hp": 85}) for i in range(batch)]
+
+    def run():
+        db.save_players(rows)
+    return run, batch, {}
+
+
+def build_cases(quick, db):
+    """(name, params, factory) for every benchmark."""
+    enemy_counts = QUICK_ENEMY_COUNTS if quick else ENEMY_COUNTS
+    player_counts = QUICK_PLAYER_COUNTS if quick else PLAYER_COUNTS
+    cases = []
+    for n in enemy_counts:
+        cases.append(("combat.player_attack", {"enemies": n}, lambda n=n: case_player_attack(n)))
+        for skill in SKILLS:
+            cases.append((f"skills.{skill}", {"enemies": n}, lambda n=n, s=skill: case_skill(s, n)))
+        cases.append(("enemies.spawn_enemy", {"enemies": n}, lambda n=n: case_spawn_enemy(n)))
+        cases.append(("enemy_ai.step", {"enemies": n}, lambda n=n: case_enemy_ai(n)))
+    cases.append(("biome.get_biome", {}, case_get_biome))
+    cases.append(("biome.is_safe_spawn", {}, case_is_safe_spawn))
+    cases.append(("biome.biome_region_64x64", {}, case_biome_region))
+    cases.append(("world.spawn_table.pick", {}, case_spawn_pick))
+    cases.append(("player.serialize", {}, case_serialize))
+    for n in player_counts:
+        cases.append(("player.get_state", {"players": n}, lambda n=n: case_get_state(n)))
+    cases.append(("database.save_player", {}, lambda: case_save_player(db)))
+    cases.append(("database.save_players", {"batch": 100}, lambda: case_save_players(db, 100)))
+    return cases
+
+
+def case_key(name, params):
+    if not params:
+        return name
+    return name + "[" + ",".join(f"{k}={v}" for k, v in sorted(params.items())) + "]"
+
+
+# -----------------------------------------------------------
+# Runner
+# -----------------------------------------------------------
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root_dir,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(args):
+    tmp = tempfile.mkdtemp(prefix="isekai_bench_")
+    db = Database(os.path.join(tmp, "bench.db"))
+    db.enable_wal()  # same journaling as the running server
+    # New players load their saved row and kills queue saves: keep both off the real database
+    player_module.db = db
+    player_module.persistence = PlayerPersistence(db)
+
+    results = {}
+    for name, params, factory in build_cases(args.quick, db):
+        key = case_key(name, params)
+        if args.filter and args.filter not in key:
+            continue
+        fn, batch, extra = factory()
+        best, median, loops = measure(fn, repeat=args.repeat, min_time=args.min_time)
+        per_item = best / batch
+        results[key] = {
+            "name": name,
+            "params": {**params, **extra},
+            "batch": batch,
+            "loops": loops,
+            "best_us": round(best * 1e6, 3),
+            "median_us": round(median * 1e6, 3),
+            "per_item_ns": round(per_item * 1e9, 1),
+            "items_per_s": round(1 / per_item) if per_item > 0 else None,
+        }
+        print(f"{key:55s} {best * 1e6:12.2f} us/op  {per_item * 1e9:12.1f} ns/item")
+    db.close()
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline):
+    """Print per-case speed ratios against a previous result file."""
+    print(f"\n{'case':55s} {'base us':>10s} {'now us':>10s} {'change':>8s}")
+    for key, now in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if not base:
+            print(f"{key:55s} {'-':>10s} {now['best_us']:10.2f} {'new':>8s}")
+            continue
+        change = (now["best_us"] - base["best_us"]) / base["best_us"] * 100 if base["best_us"] else 0.0
+        print(f"{key:55s} {base['best_us']:10.2f} {now['best_us']:10.2f} {change:+7.1f}%")
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Isekai Online server benchmarks")
+    p.add_argument("--json", help="write results to this file")
+    p.add_argument("--compare", help="previous results file to diff against")
+    p.add_argument("--filter", help="only run cases whose name contains this")
+    p.add_argument("--quick", action="store_true", help="smaller scaling sweep")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--min-time", type=float, default=0.1, help="seconds per timing run")
+    args = p.parse_args(argv)
+
+    report = run_benchmarks(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@
 # Handles drawing the terrain, mobs, players, and camera tracking.
 
 import math
+from collections import OrderedDict
 import pygame
 import sys
 import os
@@ -13,12 +14,21 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 import config as cfg
-from shared.biome import get_biome
+from shared.biome import BIOMES, biome_region, is_blocked
+from client.text_cache import render_text
 
 # Config constants
 SCREEN_W = cfg.SCREEN_W
 SCREEN_H = cfg.SCREEN_H
 TILE_SIZE = cfg.TILE_SIZE
+TERRAIN_CHUNK_TILES = cfg.TERRAIN_CHUNK_TILES
+TERRAIN_CHUNK_CACHE = cfg.TERRAIN_CHUNK_CACHE
+
+CHUNK_PX = TERRAIN_CHUNK_TILES * TILE_SIZE
+# Tree sprites are drawn at (-30, -60) from their tile and are larger
+# than a tile, so a chunk also bakes trees from this many border tiles
+TREE_OFFSET = (30, 60)
+TREE_PAD = 2
 
 
 class RenderEngine:
@@ -30,20 +40,53 @@ class RenderEngine:
         self.font = font
         self.cam_x = 0
         self.cam_y = 0
+        self.chunks = OrderedDict()  # (chunk col, chunk row) -> baked Surface, LRU order
 
     # -----------------------------------------------------------
     # Helper Methods
     # -----------------------------------------------------------
     def is_blocked(self, x, y):
         """Check if a tile should block movement (water, trees)."""
-        if get_biome(x, y) == "water":
-            return True
+        return is_blocked(x, y)
 
-        c, r = int(x // TILE_SIZE), int(y // TILE_SIZE)
-        seed = (c * 73856093) ^ (r * 19349663)
-        if (seed % 100) < 15 and get_biome(c * 64, r * 64) == "grass":
-            return True
-        return False
+    # -----------------------------------------------------------
+    # Terrain Chunk Cache
+    # -----------------------------------------------------------
+    def bake_chunk(self, ccx, ccy):
+        """Render ground tiles and trees for one chunk onto its own surface."""
+        surf = pygame.Surface((CHUNK_PX, CHUNK_PX)).convert()
+        c0, r0 = ccx * TERRAIN_CHUNK_TILES, ccy * TERRAIN_CHUNK_TILES
+        n = TERRAIN_CHUNK_TILES + 2 * TREE_PAD
+        region = biome_region(c0 - TREE_PAD, r0 - TREE_PAD, n, n)
+
+        tiles = [self.imgs[name] for name in BIOMES]
+        for c in range(TREE_PAD, TREE_PAD + TERRAIN_CHUNK_TILES):
+            for r in range(TREE_PAD, TREE_PAD + TERRAIN_CHUNK_TILES):
+                pos = ((c - TREE_PAD) * TILE_SIZE, (r - TREE_PAD) * TILE_SIZE)
+                surf.blit(tiles[region.biome[r * n + c]], pos)
+
+        # Same column-major order as a full-screen pass, so overlaps match
+        tree = self.imgs["tree"]
+        for c in range(n):
+            for r in range(n):
+                if region.tree[r * n + c]:
+                    pos = ((c - TREE_PAD) * TILE_SIZE - TREE_OFFSET[0],
+                           (r - TREE_PAD) * TILE_SIZE - TREE_OFFSET[1])
+                    surf.blit(tree, pos)
+        return surf
+
+    def get_chunk(self, ccx, ccy):
+        """Baked chunk surface, from the LRU cache when possible."""
+        key = (ccx, ccy)
+        surf = self.chunks.get(key)
+        if surf is not None:
+            self.chunks.move_to_end(key)
+            return surf
+        surf = self.bake_chunk(ccx, ccy)
+        self.chunks[key] = surf
+        if len(self.chunks) > TERRAIN_CHUNK_CACHE:
+            self.chunks.popitem(last=False)
+        return surf
 
     # -----------------------------------------------------------
     # Drawing Functions
@@ -60,22 +103,10 @@ class RenderEngine:
             self.cam_y += (me["y"] - SCREEN_H // 2 - self.cam_y) * 0.1
         cam_x, cam_y = self.cam_x, self.cam_y
 
-        # --- Ground Tiles ---
-        sc = int(cam_x // TILE_SIZE)
-        sr = int(cam_y // TILE_SIZE)
-        for c in range(sc, sc + SCREEN_W // TILE_SIZE + 2):
-            for r in range(sr, sr + SCREEN_H // TILE_SIZE + 2):
-                wx, wy = c * TILE_SIZE, r * TILE_SIZE
-                self.screen.blit(self.imgs[get_biome(wx, wy)], (wx - cam_x, wy - cam_y))
-
-        # --- Trees ---
-        for c in range(sc, sc + SCREEN_W // TILE_SIZE + 2):
-            for r in range(sr, sr + SCREEN_H // TILE_SIZE + 2):
-                seed = (c * 73856093) ^ (r * 19349663)
-                if (seed % 100) < 15:
-                    wx, wy = c * TILE_SIZE, r * TILE_SIZE
-                    if get_biome(wx, wy) == "grass":
-                        self.screen.blit(self.imgs["tree"], (wx - cam_x - 30, wy - cam_y - 60))
+        # --- Ground Tiles + Trees (pre-baked chunks) ---
+        for ccx in range(int(cam_x // CHUNK_PX), int((cam_x + SCREEN_W) // CHUNK_PX) + 1):
+            for ccy in range(int(cam_y // CHUNK_PX), int((cam_y + SCREEN_H) // CHUNK_PX) + 1):
+                self.screen.blit(self.get_chunk(ccx, ccy), (ccx * CHUNK_PX - cam_x, ccy * CHUNK_PX - cam_y))
 
         # --- NPCs (Guild Master placeholder) ---
         for nid, npc in npcs.items():
@@ -83,7 +114,7 @@ class RenderEngine:
             # Use warrior sprite as stand-in for NPC
             self.screen.blit(self.imgs.get("warrior"), (sx - 32, sy - 32))
             # Draw name above
-            name_surf = self.font.render(npc["name"], True, (180, 150, 80))
+            name_surf = render_text(self.font, npc["name"], (180, 150, 80))
             self.screen.blit(name_surf, (sx - name_surf.get_width()//2, sy - 50))
 
         # --- Mobs ---
@@ -99,7 +130,7 @@ class RenderEngine:
             self.screen.blit(self.imgs[p_cls], (sx - 32, sy - 32))
             tag = f"Lv.{p['lvl']} {p_cls.title()}"
             col = (0, 255, 0) if pid == me else (255, 100, 100)
-            label = self.font.render(tag, True, col)
+            label = render_text(self.font, tag, col)
             self.screen.blit(label, (sx - label.get_width() / 2, sy - 50))
 
     def draw_bar(self, x, y, width, hp, max_hp, bg_col, fg_col):
@@ -23,8 +23,9 @@ from client.ui_quest import QuestUI
 from client.ui_dialogue import DialogueUI
 from client.visual_fx import VFXManager
 from client.ui_title import TitleScreen
-# Story data
+# Story data + wire protocol
 from shared.story import START_DIALOGUE
+from shared import protocol
 
 # Config constants
 SCREEN_W = cfg.SCREEN_W
@@ -79,10 +80,13 @@ class GameClient:
 
         # runtime state
         self.ws = None
+        self.codec = protocol.CODEC_JSON  # switched once the server confirms in INIT
         self.my_id = None
         self.my_class = "warrior"
         self.players = {}
         self.mobs = {}
+        self.enemy_seq = 0      # latest enemy delta applied
+        self.acked_seq = 0      # latest enemy delta acknowledged to the server
         self.username = ""
         self.password = ""
         self.mode = "LOGIN"  # or REGISTER
@@ -130,7 +134,8 @@ class GameClient:
             self.ws = await websockets.connect(f"ws://{HOST}:{PORT}")
 
             # First packet decides flow: REGISTER / LOGIN
-            payload = {"type": self.mode, "username": self.username, "password": self.password}
+            payload = {"type": self.mode, "username": self.username, "password": self.password,
+                       "codecs": list(protocol.SUPPORTED_CODECS)}
             if self.mode == "REGISTER":
                 payload["class"] = self.my_class
             await self.ws.send(json.dumps(payload))
@@ -144,94 +149,139 @@ class GameClient:
     async def receiver(self):
         try:
             async for msg in self.ws:
-                data = json.loads(msg)
-                t = data.get("type")
-                if t == "INIT":
-                    self.my_id = data["id"]
-                    self.players = data["state"]
-                    self.mobs = data["mobs"]
-                    self.npcs = data.get("npcs", {})
-                    print(f"[Client] Joined as {self.my_id}")
-                    # Setup quest if any
-                    if "quest" in data and data["quest"]:
-                        self.quest_ui.set_quest(data["quest"])
-                elif t == "JOIN":
-                    self.players[data["id"]] = data["data"]
-                elif t == "UPDATE":
-                    pid = data["id"]
-                    if pid in self.players:
-                        self.players[pid]["x"] = data["x"]
-                        self.players[pid]["y"] = data["y"]
-                elif t == "COMBAT":
-                    self.players[data["attacker"]] = data["p_data"]
-                    self.mobs = data.get("mobs", self.mobs)
-                    result = data.get("result", {})
-                    if result.get("result") == "hit":
-                        mid = result.get("mob_id")
-                        dmg = result.get("damage")
-                        if mid is not None and dmg is not None and mid in self.mobs:
-                            mob = self.mobs[mid]
-                            self.vfx.add_damage(mob["x"], mob["y"], dmg)
-                            self.vfx.add_shake(1)
-                    elif result.get("result") == "kill":
-                        mid = result.get("mob_id")
-                        dmg = result.get("damage")
-                        if mid is not None and dmg is not None:
-                            # Show damage numbers for last hit
-                            self.vfx.add_damage(self.mobs.get(mid, {"x":0,"y":0})["x"], self.mobs.get(mid, {"x":0,"y":0})["y"], dmg, is_crit=True)
-                            self.vfx.add_shake(3)
-                elif t == "SKILL_FX":
-                    # Trigger visual effects for skill usage
-                    attacker = data.get("attacker")
-                    skill_name = data.get("skill")
-                    result = data.get("result", {})
-                    if "events" in result:
-                        for ev in result["events"]:
-                            etype = ev.get("type")
-                            if etype in ("hit", "aoe_hit", "step_hit", "slash_hit"):
-                                if "mob" in ev:
-                                    mob = self.mobs.get(ev["mob"])
-                                    if mob:
-                                        self.vfx.add_damage(mob["x"], mob["y"], ev["damage"])
-                                        self.vfx.add_skill_flash(mob["x"], mob["y"], skill_name)
-                                        self.vfx.add_shake(2)
-                            elif etype == "heal":
-                                player = self.players.get(ev.get("target"))
-                                if player:
-                                    self.vfx.add_heal(player["x"], player["y"], ev["amount"])
-                    # Update mobs state from server
-                    if "mobs" in data:
-                        self.mobs = data["mobs"]
-                elif t == "CHAT":
-                    pid = data["id"]
-                    name = self.players.get(pid, {}).get("class", f"Player-{pid}")
-                    self.chat.add(name, data.get("text", ""))
-                elif t == "LOGIN_FAIL":
-                    print("[Client] Login failed:", data.get("reason"))
-                    pygame.quit(); raise SystemExit
-                elif t == "LEAVE":
-                    self.players.pop(data["id"], None)
-                elif t == "DIALOGUE":
-                    # Start dialogue window
-                    if "dialogue_id" in data and data["dialogue_id"] == "intro":
-                        self.dialogue_ui.start_dialogue(data["npc_name"], START_DIALOGUE.lines)
-                elif t == "QUEST_UPDATE":
-                    if "quest" in data:
-                        self.quest_ui.set_quest(data["quest"])
-                elif t == "QUEST_COMPLETE":
-                    if quest := self.quest_ui.quest:
-                        self.quest_ui.complete_quest(data.get("xp", 0))
-                        # Update player data if server sent new stats
-                        if "p_data" in data:
-                            self.players[self.my_id] = data["p_data"]
-                elif t == "CORRECT_POSITION":
-                    # Server correcting our position (anti-cheat)
-                    if self.my_id in self.players:
-                        self.players[self.my_id]["x"] = data["x"]
-                        self.players[self.my_id]["y"] = data["y"]
+                self.handle_packet(protocol.decode(msg))
+                # Tell the server which enemy delta we now hold
+                if self.enemy_seq > self.acked_seq:
+                    self.acked_seq = self.enemy_seq
+                    await self.ws.send(json.dumps({"type": "ACK", "seq": self.acked_seq}))
         except Exception as e:
             print("[Client Receiver Error]", e)
 
+    def handle_packet(self, data):
+        """Apply a single server packet to local state."""
+        t = data.get("type")
+        if t == "TICK":
+            # One coalesced packet per server tick, limited to our area of interest
+            self.players.update(data.get("enter", {}))
+            enemies = data.get("enemies", {})
+            if enemies.get("reset"):
+                self.mobs = {}
+            self.mobs.update(enemies.get("spawn", {}))
+            for mid, fields in enemies.get("update", {}).items():
+                if mid in self.mobs:
+                    self.mobs[mid].update(fields)
+            self.apply_moves(data.get("moves", {}))
+            for event in data.get("events", []):
+                self.handle_packet(event)
+            # Removals last so this tick's events can still find their targets
+            for pid in data.get("leave", []):
+                if pid != self.my_id:
+                    self.players.pop(pid, None)
+            for mid in enemies.get("despawn", []):
+                self.mobs.pop(mid, None)
+            self.enemy_seq = enemies.get("seq", self.enemy_seq)
+        elif t == "MOVES":
+            # Binary codec: player positions arrive separately from the TICK
+            self.apply_moves(data["moves"])
+        elif t == "INIT":
+            self.my_id = data["id"]
+            self.players = data["state"]
+            self.mobs = data.get("enemies", {})
+            self.enemy_seq = self.acked_seq = data.get("enemy_seq", 0)
+            self.codec = data.get("codec", protocol.CODEC_JSON)
+            self.npcs = data.get("npcs", {})
+            print(f"[Client] Joined as {self.my_id}")
+            # Setup quest if any
+            if "quest" in data and data["quest"]:
+                self.quest_ui.set_quest(data["quest"])
+        elif t == "JOIN":
+            self.players[data["id"]] = data["data"]
+        elif t == "UPDATE":
+            pid = data["id"]
+            if pid in self.players:
+                self.players[pid]["x"] = data["x"]
+                self.players[pid]["y"] = data["y"]
+        elif t == "COMBAT":
+            self.players[data["attacker"]] = data["p_data"]
+            result = data.get("result", {})
+            if result.get("result") == "hit":
+                mid = result.get("enemy_id")
+                dmg = result.get("damage")
+                if mid is not None and dmg is not None and mid in self.mobs:
+                    mob = self.mobs[mid]
+                    self.vfx.add_damage(mob["x"], mob["y"], dmg)
+                    self.vfx.add_shake(1)
+            elif result.get("result") == "kill":
+                mid = result.get("enemy_id")
+                dmg = result.get("damage")
+                if mid is not None and dmg is not None:
+                    # Show damage numbers for last hit
+                    self.vfx.add_damage(self.mobs.get(mid, {"x":0,"y":0})["x"], self.mobs.get(mid, {"x":0,"y":0})["y"], dmg, is_crit=True)
+                    self.vfx.add_shake(3)
+        elif t == "SKILL_FX":
+            # Trigger visual effects for skill usage
+            attacker = data.get("attacker")
+            skill_name = data.get("skill")
+            result = data.get("result", {})
+            if "p_data" in data:
+                self.players[attacker] = data["p_data"]
+            if "events" in result:
+                for ev in result["events"]:
+                    etype = ev.get("type")
+                    if etype in ("hit", "aoe_hit", "step_hit", "slash_hit"):
+                        if "mob" in ev:
+                            mob = self.mobs.get(ev["mob"])
+                            if mob:
+                                self.vfx.add_damage(mob["x"], mob["y"], ev["damage"])
+                                self.vfx.add_skill_flash(mob["x"], mob["y"], skill_name)
+                                self.vfx.add_shake(2)
+                    elif etype == "heal":
+                        player = self.players.get(ev.get("target"))
+                        if player:
+                            self.vfx.add_heal(player["x"], player["y"], ev["amount"])
+        elif t == "ENEMY_ATTACK":
+            target = data.get("target")
+            if "p_data" in data:
+                self.players[target] = data["p_data"]
+            player = self.players.get(target)
+            if player and not data.get("killed"):
+                self.vfx.add_damage(player["x"], player["y"], data["damage"])
+                if target == self.my_id:
+                    self.vfx.add_shake(2)
+        elif t == "CHAT":
+            pid = data["id"]
+            name = self.players.get(pid, {}).get("class", f"Player-{pid}")
+            self.chat.add(name, data.get("text", ""))
+        elif t == "LOGIN_FAIL":
+            print("[Client] Login failed:", data.get("reason"))
+            pygame.quit(); raise SystemExit
+        elif t == "LEAVE":
+            self.players.pop(data["id"], None)
+        elif t == "DIALOGUE":
+            # Start dialogue window
+            if "dialogue_id" in data and data["dialogue_id"] == "intro":
+                self.dialogue_ui.start_dialogue(data["npc_name"], START_DIALOGUE.lines)
+        elif t == "QUEST_UPDATE":
+            if "quest" in data:
+                self.quest_ui.set_quest(data["quest"])
+        elif t == "QUEST_COMPLETE":
+            if quest := self.quest_ui.quest:
+                self.quest_ui.complete_quest(data.get("xp", 0))
+                # Update player data if server sent new stats
+                if "p_data" in data:
+                    self.players[self.my_id] = data["p_data"]
+        elif t == "CORRECT_POSITION":
+            # Server correcting our position (anti-cheat)
+            if self.my_id in self.players:
+                self.players[self.my_id]["x"] = data["x"]
+                self.players[self.my_id]["y"] = data["y"]
+
+    def apply_moves(self, moves):
+        for pid, (x, y) in moves.items():
+            if pid in self.players:
+                self.players[pid]["x"] = x
+                self.players[pid]["y"] = y
+
     # -----------------------------------------------------------
     # Main game loop
     # -----------------------------------------------------------
@@ -295,11 +345,11 @@ class GameClient:
                 if dx or dy:
                     me["x"] += dx
                     me["y"] += dy
-                    await self.ws.send(json.dumps({
+                    await self.ws.send(protocol.encode({
                         "type": "MOVE",
                         "x": int(me["x"]),
                         "y": int(me["y"])
-                    }))
+                    }, self.codec))
 
             # Update visual FX
             self.vfx.update()
@@ -7,6 +7,7 @@ import asyncio
 import json
 import websockets
 from Isekai_Online.config import HOST, PORT
+from Isekai_Online.shared import protocol
 
 
 class GameNetwork:
@@ -15,6 +16,7 @@ class GameNetwork:
     def __init__(self):
         self.ws = None
         self.connected = False
+        self.codec = protocol.CODEC_JSON
 
     # -----------------------------------------------------------
     # CONNECTION
@@ -25,7 +27,8 @@ class GameNetwork:
             try:
                 print(f"[Network] Connecting to {HOST}:{PORT} (Attempt {attempt + 1})...")
                 self.ws = await websockets.connect(f"ws://{HOST}:{PORT}")
-                await self.ws.send(json.dumps({"type": "INIT", "class": player_class}))
+                await self.ws.send(json.dumps({"type": "INIT", "class": player_class,
+                                               "codecs": list(protocol.SUPPORTED_CODECS)}))
                 self.connected = True
                 print("[Network] Connected!")
                 return True
@@ -42,7 +45,7 @@ class GameNetwork:
         if not self.ws or not self.connected:
             return
         try:
-            await self.ws.send(json.dumps(payload))
+            await self.ws.send(protocol.encode(payload, self.codec))
         except Exception as e:
             print(f"[Network] Send error: {e}")
             self.connected = False
@@ -61,7 +64,9 @@ class GameNetwork:
 
         try:
             async for message in self.ws:
-                data = json.loads(message)
+                data = protocol.decode(message)
+                if data.get("type") == "INIT":
+                    self.codec = data.get("codec", protocol.CODEC_JSON)
                 await handler(data)
         except Exception as e:
             print(f"[Network] Disconnected: {e}")
@@ -0,0 +1,56 @@
+# ===============================================================
+# Isekai Online - Text Surface Cache
+# ===============================================================
+# font.render rasterises the string every call. Labels, HUD numbers
+# and chat lines barely change between frames, so rendered surfaces
+# are kept in a bounded LRU keyed by (text, color, font).
+
+from collections import OrderedDict
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+
+# Config constant
+TEXT_CACHE_SIZE = cfg.TEXT_CACHE_SIZE
+
+
+class TextCache:
+    """Bounded LRU of rendered text surfaces."""
+
+    def __init__(self, max_size: int = TEXT_CACHE_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Cached font.render; the returned surface is shared, don't draw on it."""
+        key = (text, tuple(color), font, antialias)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surf
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self.surfaces[key] = surf
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# Shared by the renderer and every UI panel
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """Render text through the shared cache."""
+    return text_cache.render(font, text, color, antialias)
@@ -13,6 +13,7 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 import config as cfg
+from client.text_cache import render_text
 
 # Config constants
 SCREEN_W = cfg.SCREEN_W
@@ -53,7 +54,7 @@ class GameUI:
         pygame.draw.rect(self.screen, (255, 255, 0), (20, 45, 180 * xp_ratio, 10))
 
         # Text elements
-        txt1 = self.font.render(f"HP: {hp}/{max_hp}", True, (255, 255, 255))
-        txt2 = self.font.render(f"Lvl {lvl} {cls}", True, (255, 255, 255))
+        txt1 = render_text(self.font, f"HP: {hp}/{max_hp}", (255, 255, 255))
+        txt2 = render_text(self.font, f"Lvl {lvl} {cls}", (255, 255, 255))
         self.screen.blit(txt1, (25, 25))
         self.screen.blit(txt2, (25, 10))
\ No newline at end of file
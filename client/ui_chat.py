@@ -10,6 +10,7 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 import config as cfg
+from client.text_cache import render_text
 
 # Config constant
 SCREEN_H = cfg.SCREEN_H
@@ -37,12 +38,12 @@ class ChatUI:
         # history (last 8 lines)
         y = SCREEN_H - 110
         for m in self.messages:
-            surf = self.font.render(m, True, (255, 255, 255))
+            surf = render_text(self.font, m, (255, 255, 255))
             self.screen.blit(surf, (20, y))
             y += 15
 
         # input line
         if self.typing:
             pygame.draw.rect(self.screen, (20, 20, 20), (15, SCREEN_H - 30, 420, 18))
-            txt = self.font.render(self.current, True, (255, 255, 255))
+            txt = render_text(self.font, self.current, (255, 255, 255))
             self.screen.blit(txt, (18, SCREEN_H - 28))
\ No newline at end of file
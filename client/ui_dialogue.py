@@ -10,6 +10,7 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 import config as cfg
+from client.text_cache import render_text
 
 SCREEN_W = cfg.SCREEN_W
 SCREEN_H = cfg.SCREEN_H
@@ -23,6 +24,7 @@ class DialogueUI:
         self.current_line = 0
         self.lines = []
         self.speaker = ""
+        self._wrapped = (None, [])  # (text, wrapped lines) of the last line drawn
 
     def start_dialogue(self, speaker, lines):
         self.active = True
@@ -41,6 +43,25 @@ class DialogueUI:
         self.lines = []
         self.speaker = ""
 
+    def wrap(self, text, width):
+        """Word-wrap text to width pixels; remembered until the text changes."""
+        if self._wrapped[0] == text:
+            return self._wrapped[1]
+        words = text.split()
+        lines = []
+        cur = ""
+        for w in words:
+            test = cur + w + " "
+            if self.font.size(test)[0] > width:
+                lines.append(cur.strip())
+                cur = w + " "
+            else:
+                cur = test
+        if cur.strip():
+            lines.append(cur.strip())
+        self._wrapped = (text, lines)
+        return lines
+
     def draw(self):
         if not self.active or self.current_line >= len(self.lines):
             return
@@ -55,7 +76,7 @@ class DialogueUI:
         pygame.draw.rect(self.screen, (180, 150, 100), box_rect, 3)
 
         # Speaker name
-        speaker_surf = self.font.render(self.speaker, True, (255, 215, 0))
+        speaker_surf = render_text(self.font, self.speaker, (255, 215, 0))
         name_bg = pygame.Rect(box_x, box_y - 25, 200, 20)
         pygame.draw.rect(self.screen, (20, 20, 30), name_bg)
         pygame.draw.rect(self.screen, (180, 150, 100), name_bg, 2)
@@ -64,27 +85,16 @@ class DialogueUI:
         # Text content (supports line breaks)
         text = self.lines[self.current_line].text
         # Simple word wrap for dialogue
-        words = text.split()
-        lines = []
-        cur = ""
-        for w in words:
-            test = cur + w + " "
-            if self.font.size(test)[0] > box_w - 20:
-                lines.append(cur.strip())
-                cur = w + " "
-            else:
-                cur = test
-        if cur.strip():
-            lines.append(cur.strip())
+        lines = self.wrap(text, box_w - 20)
         y_offset = box_y + 10
         for i, line in enumerate(lines[:3]):  # max 3 lines visible
-            surf = self.font.render(line, True, (255, 255, 255))
+            surf = render_text(self.font, line, (255, 255, 255))
             self.screen.blit(surf, (box_x + 10, y_offset + i * 25))
 
         # Advance prompt
         if self.current_line < len(self.lines) - 1:
-            prompt_surf = self.font.render("Press SPACE to continue...", True, (150, 150, 150))
+            prompt_surf = render_text(self.font, "Press SPACE to continue...", (150, 150, 150))
             self.screen.blit(prompt_surf, (box_x + box_w - 180, box_y + box_h - 25))
         else:
-            close_prompt = self.font.render("Press SPACE to close...", True, (150, 150, 150))
+            close_prompt = render_text(self.font, "Press SPACE to close...", (150, 150, 150))
             self.screen.blit(close_prompt, (box_x + box_w - 160, box_y + box_h - 25))
\ No newline at end of file
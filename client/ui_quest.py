@@ -10,6 +10,7 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 import config as cfg
+from client.text_cache import render_text
 
 SCREEN_W = cfg.SCREEN_W
 SCREEN_H = cfg.SCREEN_H
@@ -51,13 +52,13 @@ class QuestUI:
             pygame.draw.rect(self.screen, (40, 40, 40), box_rect)
             pygame.draw.rect(self.screen, (255, 255, 255), box_rect, 2)
             # Title
-            title = self.font.render(f"Quest: {self.quest['name']}", True, (255, 215, 0))
+            title = render_text(self.font, f"Quest: {self.quest['name']}", (255, 215, 0))
             self.screen.blit(title, (SCREEN_W - 210, 15))
             # Objective
-            obj = self.font.render(f"{self.quest['objective']}: {self.quest['progress']}/{self.quest['required']}", True, (200, 200, 200))
+            obj = render_text(self.font, f"{self.quest['objective']}: {self.quest['progress']}/{self.quest['required']}", (200, 200, 200))
             self.screen.blit(obj, (SCREEN_W - 210, 35))
             # Reward
-            rew = self.font.render(f"Reward: {self.quest['reward_xp']} XP", True, (100, 200, 100))
+            rew = render_text(self.font, f"Reward: {self.quest['reward_xp']} XP", (100, 200, 100))
             self.screen.blit(rew, (SCREEN_W - 210, 55))
 
         # Quest complete notification (bottom center)
@@ -67,7 +68,7 @@ class QuestUI:
             pygame.draw.rect(self.screen, (0, 80, 0), notif_rect)
             pygame.draw.rect(self.screen, (0, 255, 0), notif_rect, 3)
             # Text
-            complete = self.font.render(f"{self.completed_quest['name']}", True, (255, 255, 255))
+            complete = render_text(self.font, f"{self.completed_quest['name']}", (255, 255, 255))
             self.screen.blit(complete, (SCREEN_W//2 - complete.get_width()//2, SCREEN_H - 90))
-            reward = self.font.render(f"+{self.completed_quest['reward_xp']} XP!", True, (255, 215, 0))
+            reward = render_text(self.font, f"+{self.completed_quest['reward_xp']} XP!", (255, 215, 0))
             self.screen.blit(reward, (SCREEN_W//2 - reward.get_width()//2, SCREEN_H - 65))
\ No newline at end of file
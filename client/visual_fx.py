@@ -14,17 +14,59 @@ import config as cfg
 
 SCREEN_W = cfg.SCREEN_W
 SCREEN_H = cfg.SCREEN_H
+VFX_MAX_NUMBERS = cfg.VFX_MAX_NUMBERS
+VFX_MAX_FLARES = cfg.VFX_MAX_FLARES
+
+GLYPH_CHARS = "0123456789+-"
+
+
+class GlyphFont:
+    """One shared font with pre-rendered glyphs per color.
+
+    Damage numbers are drawn by blitting cached digit surfaces side by
+    side, so spawning a number never creates a font or renders text.
+    """
+
+    def __init__(self, name="Arial", size=18, bold=True):
+        self.font = pygame.font.SysFont(name, size, bold=bold)
+        self.glyphs = {}  # color -> {char: Surface}
+
+    def glyph_set(self, color):
+        glyphs = self.glyphs.get(color)
+        if glyphs is None:
+            glyphs = {ch: self.font.render(ch, True, color) for ch in GLYPH_CHARS}
+            self.glyphs[color] = glyphs
+        return glyphs
+
+    def draw(self, surface, text, color, x, y):
+        glyphs = self.glyph_set(color)
+        for ch in text:
+            g = glyphs.get(ch)
+            if g is None:  # rare non-digit character: render once and keep it
+                g = glyphs[ch] = self.font.render(ch, True, color)
+            surface.blit(g, (x, y))
+            x += g.get_width()
 
 
 class DamageNumber:
-    def __init__(self, x, y, text, color=(255, 255, 255)):
+    """Pooled floating number; reset() reuses the record in place."""
+    __slots__ = ("x", "y", "text", "timer", "color", "vel_y")
+
+    def __init__(self):
+        self.x = self.y = 0
+        self.text = ""
+        self.timer = 0
+        self.color = (255, 255, 255)
+        self.vel_y = -1
+
+    def reset(self, x, y, text, color=(255, 255, 255)):
         self.x = x + random.randint(-10, 10)
         self.y = y
         self.text = text
         self.timer = 60
         self.color = color
-        self.font = pygame.font.SysFont("Arial", 18, bold=True)
         self.vel_y = -1
+        return self
 
     def update(self):
         self.y += self.vel_y
@@ -33,39 +75,100 @@ class DamageNumber:
             self.vel_y = 0
         return self.timer > 0
 
-    def draw(self, surface, cam_x, cam_y):
-        screen_x = self.x - cam_x
-        screen_y = self.y - cam_y
-        alpha = min(255, self.timer * 4)
-        surf = self.font.render(self.text, True, self.color)
-        surface.blit(surf, (screen_x, screen_y))
+    def draw(self, surface, cam_x, cam_y, glyph_font):
+        glyph_font.draw(surface, self.text, self.color, self.x - cam_x, self.y - cam_y)
+
+
+class HitFlare:
+    """Pooled expanding ring."""
+    __slots__ = ("x", "y", "timer", "color", "radius")
+
+    def __init__(self):
+        self.x = self.y = 0
+        self.timer = 0
+        self.color = (255, 255, 255)
+        self.radius = 0
+
+    def reset(self, x, y, timer, color, radius):
+        self.x, self.y = x, y
+        self.timer = timer
+        self.color = color
+        self.radius = radius
+        return self
+
+    def update(self):
+        self.timer -= 1
+        self.radius += 1
+        return self.timer >= 0
+
+
+class Pool:
+    """Fixed-capacity object pool; when full the oldest live item is reused."""
+
+    def __init__(self, factory, capacity):
+        self.free = [factory() for _ in range(capacity)]
+        self.live = []  # active items, oldest first
+
+    def acquire(self):
+        if self.free:
+            item = self.free.pop()
+        else:
+            item = self.live.pop(0)
+        self.live.append(item)
+        return item
+
+    def update(self):
+        """Advance every live item, compacting the live list in place."""
+        live = self.live
+        keep = 0
+        for item in live:
+            if item.update():
+                live[keep] = item
+                keep += 1
+            else:
+                self.free.append(item)
+        del live[keep:]
+
+
+# Skill name -> (frames, color, start radius)
+SKILL_FLARES = {
+    "Fireball": (20, (255, 100, 0), 45),
+    "PowerStrike": (15, (255, 255, 100), 25),
+    "ShadowStep": (25, (180, 180, 255), 30),
+    "WindSlash": (10, (200, 255, 255), 40),
+}
 
 
 class VFXManager:
     def __init__(self):
-        self.damage_numbers = []
-        self.hit_flares = []  # (x, y, timer, color, radius)
+        self.glyph_font = GlyphFont()
+        self.numbers = Pool(DamageNumber, VFX_MAX_NUMBERS)
+        self.flares = Pool(HitFlare, VFX_MAX_FLARES)
         self.shake_timer = 0
         self.shake_intensity = 0
 
+    @property
+    def damage_numbers(self):
+        return self.numbers.live
+
+    @property
+    def hit_flares(self):
+        return self.flares.live
+
     # Add damage/heal numbers (client receives from server)
     def add_damage(self, x, y, dmg, is_crit=False):
         color = (255, 200, 50) if is_crit else (255, 80, 80)
-        self.damage_numbers.append(DamageNumber(x, y - 20, str(dmg), color))
+        self.numbers.acquire().reset(x, y - 20, str(dmg), color)
 
     def add_heal(self, x, y, amount):
-        self.damage_numbers.append(DamageNumber(x, y - 20, f"+{amount}", (80, 255, 80)))
+        self.numbers.acquire().reset(x, y - 20, f"+{amount}", (80, 255, 80))
 
     # Combat visual flash from skill use
     def add_skill_flash(self, x, y, skill_name):
-        if skill_name == "Fireball":
-            self.hit_flares.append([x, y, 20, (255, 100, 0), 45])
-        elif skill_name == "PowerStrike":
-            self.hit_flares.append([x, y, 15, (255, 255, 100), 25])
-        elif skill_name == "ShadowStep":
-            self.hit_flares.append([x, y, 25, (180, 180, 255), 30])
-        elif skill_name == "WindSlash":
-            self.hit_flares.append([x, y, 10, (200, 255, 255), 40])
+        flare = SKILL_FLARES.get(skill_name)
+        if flare:
+            timer, color, radius = flare
+            self.flares.acquire().reset(x, y, timer, color, radius)
 
     # Screen shake on powerful attacks
     def add_shake(self, intensity=4):
@@ -73,14 +176,8 @@ class VFXManager:
         self.shake_intensity = intensity
 
     def update(self):
-        # Update damage numbers
-        self.damage_numbers = [d for d in self.damage_numbers if d.update()]
-        # Update hit flares
-        new_flares = []
-        for x, y, t, col, rad in self.hit_flares:
-            if t > 0:
-                new_flares.append([x, y, t - 1, col, rad + 1])
-        self.hit_flares = new_flares
+        self.numbers.update()
+        self.flares.update()
         # Update shake
         if self.shake_timer > 0:
             self.shake_timer -= 1
@@ -95,11 +192,11 @@ class VFXManager:
 
     def draw(self, surface, cam_x, cam_y):
         # Draw flares
-        for x, y, t, col, rad in self.hit_flares:
-            screen_x = int(x - cam_x)
-            screen_y = int(y - cam_y)
-            alpha = min(200, t * 10)
-            pygame.draw.circle(surface, (*col, alpha), (screen_x, screen_y), rad, 2)
+        for f in self.flares.live:
+            screen_x = int(f.x - cam_x)
+            screen_y = int(f.y - cam_y)
+            alpha = min(200, f.timer * 10)
+            pygame.draw.circle(surface, (*f.color, alpha), (screen_x, screen_y), f.radius, 2)
         # Draw damage numbers
-        for dmg in self.damage_numbers:
-            dmg.draw(surface, cam_x, cam_y)
\ No newline at end of file
+        for dmg in self.numbers.live:
+            dmg.draw(surface, cam_x, cam_y, self.glyph_font)
@@ -13,9 +13,21 @@ PORT = 8765
 # --- Screen ---
 SCREEN_W = 800
 SCREEN_H = 600
+TERRAIN_CHUNK_TILES = 8  # terrain is baked into chunks of N x N tiles
+TERRAIN_CHUNK_CACHE = 16  # baked chunks kept in memory (LRU)
+TEXT_CACHE_SIZE = 512  # rendered text surfaces kept in memory (LRU)
+VFX_MAX_NUMBERS = 128  # pooled floating damage numbers
+VFX_MAX_FLARES = 64  # pooled skill hit flares
 
 # --- World ---
 TILE_SIZE = 64
+WORLD_W = 3200  # extent of the precomputed biome grid (world units)
+WORLD_H = 3200
+BIOME_CACHE_FILE = None  # optional path to persist the biome grid; None builds it at startup
+
+# --- Area of Interest ---
+AOI_CELL_SIZE = TILE_SIZE * 8     # interest grid cell edge (world units)
+AOI_VIEW_RADIUS = TILE_SIZE * 10  # clients only hear about things this close
 
 # --- Player Defaults ---
 DEFAULT_STATS = {
@@ -30,6 +42,18 @@ XP_FROM_SLIME = 35
 
 # --- Performance ---
 TICK_RATE = 60  # frames per second for client
+SERVER_TICK_RATE = 20  # simulation ticks per second (one state flush per tick)
+METRICS_DUMP_INTERVAL = 10.0  # seconds between server/metrics.json dumps (0 disables)
+METRICS_LAG_INTERVAL = 0.1  # event-loop lag probe period (seconds)
+SEND_QUEUE_LIMIT = 256  # packets queued per client before it is dropped as too slow
+
+# --- Zone Sharding ---
+ZONE_SHARDING = False  # simulate spawn zones in worker processes; this process becomes the gateway
+ZONE_SHARD_GROUPS = [  # one worker process per group of SpawnZone names
+    ["Castle", "Grasslands"],
+    ["Eastern Plains"],
+    ["Southern Ruins"],
+]
 
 # --- Version ---
 GAME_VERSION = "v0.5 (Architecture Update)"
@@ -59,12 +83,44 @@ MOB_MIN_LEVEL = 1
 MOB_MAX_LEVEL = 20
 MOB_BASE_HP = 25
 MOB_HP_PER_LEVEL = 10
+INITIAL_ENEMY_COUNT = 75  # spawn attempts at server start (spread over all zones)
+ENEMY_TYPES_FILE = None  # optional JSON of enemy types merged over the built-in ones
+ENEMY_STAT_LEVELS = 50  # levels precomputed per enemy type (higher ones are scaled on demand)
+ENEMY_DELTA_HISTORY = 64  # ticks of enemy changes kept for delta resends
+SPATIAL_CELL_SIZE = TILE_SIZE * 2  # enemy spatial hash cell edge (world units)
+ENEMY_MIN_SPACING = 24  # spawns avoid landing this close to another enemy
+ENEMY_SPAWN_TRIES = 8  # spacing retries before a crowded zone spawns anyway
+ENEMY_RESPAWN_DELAY = 5.0  # seconds before a killed enemy's replacement appears
+ENEMY_RESPAWN_BATCH = 10  # most respawns processed per server tick
+ENEMY_ZONE_POPULATION = {}  # zone name -> population target; unset zones share INITIAL_ENEMY_COUNT
+
+# --- Enemy AI ---
+ENEMY_AI = True  # enemies chase and attack nearby players
+ENEMY_AGGRO_RADIUS = 240  # enemies wake up when a player is this close
+ENEMY_LEASH_RADIUS = 480  # ...and give up on players this far from where they woke
+ENEMY_ATTACK_RANGE = 40
+ENEMY_ATTACK_COOLDOWN = 1.5  # seconds between one enemy's attacks
+ENEMY_SPEED_SCALE = 30  # world units per second per point of enemy speed
 
 # --- Skills ---
 WARRIOR_SKILL_RANGE = 100
 MAGE_SKILL_RANGE = 140
 ROGUE_SKILL_RANGE = 120
 NINJA_SKILL_RANGE = 220
+SKILL_COOLDOWNS = {  # seconds between casts of the same skill by one player
+    "PowerStrike": 1.0,
+    "Fireball": 2.0,
+    "HealLight": 4.0,
+    "ShadowStep": 2.0,
+    "WindSlash": 1.5,
+}
+
+# --- Accounts & Persistence ---
+PASSWORD_HASH_WORKERS = 4  # threads running bcrypt hash/verify
+LOGIN_QUEUE_LIMIT = 200  # logins allowed to wait for a worker before 'server busy'
+PERSIST_FLUSH_INTERVAL = 5.0  # seconds between batched player saves
+DB_CACHE_SIZE_KB = 8192  # SQLite page cache per connection
+DB_STATEMENT_CACHE = 128  # prepared statements kept per connection
 
 # Game balance thresholds (prevent cheating)
 MAX_MOVE_DISTANCE = 10
@@ -0,0 +1,298 @@
+# ===============================================================
+# Isekai Online - Headless Load Test (bot swarm)
+# ===============================================================
+# Spins up many simulated players against a running server using the
+# same wire protocol as the real client: LOGIN/REGISTER (or guest
+# INIT), random-walk MOVE, ATTACK, SKILL and CHAT at configurable
+# rates. Prints latency percentiles, throughput and connection
+# failures, and can write the summary as JSON.
+#
+# Example:
+#   python load_test.py --bots 500 --ramp 50 --duration 60 --json result.json
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.abspath(__file__))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import websockets
+
+import config as cfg
+from shared import protocol
+
+# Config constants
+HOST = cfg.HOST
+PORT = cfg.PORT
+MAX_MOVE_DISTANCE = cfg.MAX_MOVE_DISTANCE
+
+# Server replies that carry our own request back, used for latency
+ECHOED = {"ATTACK": "COMBAT", "SKILL": "SKILL_FX", "CHAT": "CHAT"}
+
+
+# -----------------------------------------------------------
+# Stats
+# -----------------------------------------------------------
+def percentiles(samples):
+    """p50/p90/p99/max of a list of millisecond samples."""
+    if not samples:
+        return {"count": 0}
+    s = sorted(samples)
+
+    def pick(q):
+        return round(s[min(len(s) - 1, int(q * len(s)))], 2)
+
+    return {"count": len(s), "p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(s[-1], 2)}
+
+
+class Stats:
+    """Counters shared by every bot in the swarm."""
+
+    def __init__(self):
+        self.latency = {"LOGIN": [], "ATTACK": [], "SKILL": [], "CHAT": []}
+        self.sent = {}
+        self.received = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.connected = 0
+        self.login_failures = 0
+        self.dropped = 0
+        self.errors = {}
+        self.corrections = 0
+
+    def count(self, table, key, n=1):
+        table[key] = table.get(key, 0) + n
+
+    def summary(self, elapsed):
+        msgs_in = sum(self.received.values())
+        msgs_out = sum(self.sent.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "connected": self.connected,
+            "login_failures": self.login_failures,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "corrections": self.corrections,
+            "sent": self.sent,
+            "received": self.received,
+            "msgs_in_per_s": round(msgs_in / elapsed, 1) if elapsed else 0,
+            "msgs_out_per_s": round(msgs_out / elapsed, 1) if elapsed else 0,
+            "kb_in_per_s": round(self.bytes_in / 1024 / elapsed, 1) if elapsed else 0,
+            "kb_out_per_s": round(self.bytes_out / 1024 / elapsed, 1) if elapsed else 0,
+            "latency_ms": {k: percentiles(v) for k, v in self.latency.items()},
+        }
+
+
+# -----------------------------------------------------------
+# Bot
+# -----------------------------------------------------------
+class Bot:
+    """One simulated player connection."""
+
+    def __init__(self, index, args, stats: Stats):
+        self.index = index
+        self.args = args
+        self.stats = stats
+        self.username = f"{args.prefix}{index}"
+        self.ws = None
+        self.id = None
+        self.codec = protocol.CODEC_JSON
+        self.x = self.y = 0.0
+        self.acked_seq = 0
+        self.enemy_seq = 0
+        self.pending = {k: [] for k in ECHOED}  # request type -> send times, FIFO
+
+    # -----------------------------------------------------------
+    async def send(self, packet):
+        frame = protocol.encode(packet, self.codec)
+        await self.ws.send(frame)
+        self.stats.count(self.stats.sent, packet["type"])
+        self.stats.bytes_out += len(frame)
+
+    async def login(self):
+        """Authenticate; returns False if the server refused us."""
+        auth = self.args.auth
+        attempts = {"guest": ["INIT"], "register": ["REGISTER"], "login": ["LOGIN"], "auto": ["LOGIN", "REGISTER"]}[auth]
+        uri = f"ws://{self.args.host}:{self.args.port}"
+        for cmd in attempts:
+            self.ws = await websockets.connect(uri, max_queue=None)
+            start = time.perf_counter()
+            await self.ws.send(json.dumps({
+                "type": cmd,
+                "username": self.username,
+                "password": self.args.password,
+                "class": random.choice(("warrior", "mage", "rogue")),
+                "codecs": [self.args.codec],
+            }))
+            data = protocol.decode(await self.ws.recv())
+            if data.get("type") == "INIT":
+                self.stats.latency["LOGIN"].append((time.perf_counter() - start) * 1000)
+                self.id = data["id"]
+                self.codec = data.get("codec", protocol.CODEC_JSON)
+                me = data["state"][self.id]
+                self.x, self.y = me["x"], me["y"]
+                self.enemy_seq = self.acked_seq = data.get("enemy_seq", 0)
+                return True
+            await self.ws.close()
+        self.stats.login_failures += 1
+        return False
+
+    # -----------------------------------------------------------
+    async def receiver(self):
+        async for frame in self.ws:
+            self.stats.bytes_in += len(frame)
+            self.handle(protocol.decode(frame))
+            if self.enemy_seq > self.acked_seq:
+                self.acked_seq = self.enemy_seq
+                await self.send({"type": "ACK", "seq": self.acked_seq})
+
+    def handle(self, data):
+        t = data.get("type")
+        self.stats.count(self.stats.received, t)
+        if t == "TICK":
+            for ev in data.get("events", ()):
+                self.handle(ev)
+            enemies = data.get("enemies")
+            if enemies and "seq" in enemies:
+                self.enemy_seq = enemies["seq"]
+        elif t in ("COMBAT", "SKILL_FX") and data.get("attacker") == self.id:
+            self.echo("ATTACK" if t == "COMBAT" else "SKILL")
+            p = data.get("p_data")
+            if p:
+                self.x, self.y = p["x"], p["y"]
+        elif t == "ENEMY_ATTACK" and data.get("target") == self.id:
+            p = data["p_data"]  # a fatal hit respawns us in the castle
+            self.x, self.y = p["x"], p["y"]
+        elif t == "CHAT" and data.get("id") == self.id:
+            self.echo("CHAT")
+        elif t == "CORRECT_POSITION":
+            self.stats.corrections += 1
+            self.x, self.y = data["x"], data["y"]
+
+    def echo(self, request):
+        queue = self.pending[request]
+        if queue:
+            self.stats.latency[request].append((time.perf_counter() - queue.pop(0)) * 1000)
+
+    # -----------------------------------------------------------
+    async def act(self, request, rate, make_packet):
+        """Send one kind of request at `rate` per second (Poisson arrivals)."""
+        while True:
+            await asyncio.sleep(random.expovariate(rate))
+            packet = make_packet()
+            if request in self.pending:
+                self.pending[request].append(time.perf_counter())
+            await self.send(packet)
+
+    def next_move(self):
+        # Random walk in steps the server's anti-teleport check accepts
+        angle = random.uniform(0, 2 * math.pi)
+        step = random.uniform(0, MAX_MOVE_DISTANCE * 0.8)
+        self.x += step * math.cos(angle)
+        self.y += step * math.sin(angle)
+        return {"type": "MOVE", "x": self.x, "y": self.y}
+
+    async def run(self, stop: asyncio.Event):
+        try:
+            if not await self.login():
+                return
+        except (OSError, websockets.exceptions.WebSocketException, asyncio.TimeoutError) as e:
+            self.stats.count(self.stats.errors, type(e).__name__)
+            return
+        self.stats.connected += 1
+        a = self.args
+        actions = [
+            ("MOVE", a.move_rate, self.next_move),
+            ("ATTACK", a.attack_rate, lambda: {"type": "ATTACK"}),
+            ("SKILL", a.skill_rate, lambda: {"type": "SKILL"}),
+            ("CHAT", a.chat_rate, lambda: {"type": "CHAT", "text": "hello"}),
+        ]
+        tasks = [asyncio.create_task(self.receiver())]
+        tasks += [asyncio.create_task(self.act(*spec)) for spec in actions if spec[1] > 0]
+        stopper = asyncio.create_task(stop.wait())
+        done, _ = await asyncio.wait(tasks + [stopper], return_when=asyncio.FIRST_COMPLETED)
+        if stopper not in done:
+            # The connection ended before the test did
+            self.stats.dropped += 1
+            for t in done:
+                if t.exception() is not None:
+                    self.stats.count(self.stats.errors, type(t.exception()).__name__)
+        for t in tasks + [stopper]:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.ws.close()
+
+
+# -----------------------------------------------------------
+# Driver
+# -----------------------------------------------------------
+async def run_swarm(args):
+    stats = Stats()
+    stop = asyncio.Event()
+    start = time.perf_counter()
+    bots = []
+
+    async def spawn():
+        # Ramp up at a fixed connection rate instead of a thundering herd
+        for i in range(args.bots):
+            bots.append(asyncio.create_task(Bot(args.start_index + i, args, stats).run(stop)))
+            await asyncio.sleep(1.0 / args.ramp)
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.report_every)
+            s = stats.summary(time.perf_counter() - start)
+            print(f"[{s['elapsed_s']:7.1f}s] connected={s['connected']} dropped={s['dropped']} "
+                  f"in={s['msgs_in_per_s']}/s out={s['msgs_out_per_s']}/s "
+                  f"attack_p99={s['latency_ms']['ATTACK'].get('p99', '-')}ms")
+
+    spawner = asyncio.create_task(spawn())
+    reporter = asyncio.create_task(report())
+    await asyncio.sleep(args.duration)
+    stop.set()
+    spawner.cancel()
+    await asyncio.gather(*bots, return_exceptions=True)
+    reporter.cancel()
+    return stats.summary(time.perf_counter() - start)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Isekai Online headless load test")
+    p.add_argument("--host", default=HOST)
+    p.add_argument("--port", type=int, default=PORT)
+    p.add_argument("--bots", type=int, default=100, help="simulated players")
+    p.add_argument("--ramp", type=float, default=20.0, help="new connections per second")
+    p.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    p.add_argument("--auth", choices=("guest", "register", "login", "auto"), default="auto",
+                   help="guest skips accounts; auto logs in and registers on failure")
+    p.add_argument("--prefix", default="bot_", help="username prefix")
+    p.add_argument("--start-index", type=int, default=0)
+    p.add_argument("--password", default="loadtest")
+    p.add_argument("--codec", choices=protocol.SUPPORTED_CODECS, default=protocol.CODEC_BINARY)
+    p.add_argument("--move-rate", type=float, default=10.0, help="MOVE per second per bot")
+    p.add_argument("--attack-rate", type=float, default=1.0, help="ATTACK per second per bot")
+    p.add_argument("--skill-rate", type=float, default=0.2, help="SKILL per second per bot")
+    p.add_argument("--chat-rate", type=float, default=0.05, help="CHAT per second per bot")
+    p.add_argument("--report-every", type=float, default=5.0)
+    p.add_argument("--json", help="write the final summary to this file")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = asyncio.run(run_swarm(args))
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -33,56 +33,53 @@ class EnhancedCombatSystem:
 
         attacker = self.players.players[attacker_id]
         px, py = attacker.x, attacker.y
-        attacked_enemy = None
         combat_result = {}
 
-        # Check all enemies for attack range
-        for enemy_id, enemy in list(self.enemies.enemies.items()):
-            dist = ((enemy["x"] - px) ** 2 + (enemy["y"] - py) ** 2) ** 0.5
-            if dist < ATTACK_RANGE:  # attack range from config
-                attacked_enemy = enemy_id
-                
-                # Calculate damage based on player's stats (can be enhanced)
-                dmg = random.randint(BASE_ATTACK_MIN, BASE_ATTACK_MAX) + (attacker.level * LEVEL_DAMAGE_BONUS)
-                
-                # Apply damage
-                enemy["hp"] -= dmg
-                
-                combat_result = {
-                    "result": "hit",
-                    "attacker": attacker_id,
-                    "enemy_id": enemy_id,
-                    "damage": dmg,
-                    "enemy_hp": enemy["hp"],
-                    "enemy_max_hp": enemy["max_hp"],
-                    "enemy_type": enemy["type"],
-                    "xp": enemy["xp"],
-                }
-                
-                # Handle different enemy types for quest progress
-                if enemy["type"] == "slime":
-                    combat_result["notify_type"] = "SLIME_KILL"  # for quest progress
-                elif enemy["type"] == "goblin":
-                    combat_result["notify_type"] = "GOBLIN_KILL"
-                elif enemy["type"] == "ogre":
-                    combat_result["notify_type"] = "OGRE_KILL"
-
-                # Enemy dies
-                if enemy["hp"] <= 0:
-                    self.enemies.remove_enemy(enemy_id)
-                    self.enemies.respawn_enemy()  # Spawn a new enemy
-                        
-                    # Give XP to player
-                    attacker.add_xp(enemy["xp"])
+        # Spatial lookup: only enemies in nearby grid cells are checked,
+        # and the closest one within attack range is hit
+        enemy_id = self.enemies.nearest_enemy(px, py, ATTACK_RANGE)
+        if enemy_id is not None:
+            enemy = self.enemies.enemies[enemy_id]
+            
+            # Calculate damage based on player's stats (can be enhanced)
+            dmg = random.randint(BASE_ATTACK_MIN, BASE_ATTACK_MAX) + (attacker.level * LEVEL_DAMAGE_BONUS)
+            
+            # Apply damage
+            enemy.hp -= dmg
+            self.enemies.mark_dirty(enemy_id, "hp")
+            
+            combat_result = {
+                "result": "hit",
+                "attacker": attacker_id,
+                "enemy_id": enemy_id,
+                "damage": dmg,
+                "enemy_hp": enemy.hp,
+                "enemy_max_hp": enemy.max_hp,
+                "enemy_type": enemy.type,
+                "xp": enemy.xp,
+            }
+            
+            # Handle different enemy types for quest progress
+            if enemy.type == "slime":
+                combat_result["notify_type"] = "SLIME_KILL"  # for quest progress
+            elif enemy.type == "goblin":
+                combat_result["notify_type"] = "GOBLIN_KILL"
+            elif enemy.type == "ogre":
+                combat_result["notify_type"] = "OGRE_KILL"
+
+            # Enemy dies
+            if enemy.hp <= 0:
+                self.enemies.kill_enemy(enemy_id)  # replacement spawns on a later tick
                     
-                    combat_result["result"] = "kill"
-                    combat_result["xp_gained"] = enemy["xp"]
-                    combat_result["enemy_type"] = enemy["type"]
-                    combat_result["new_level"] = attacker.level
-
-                break
+                # Give XP to player
+                attacker.add_xp(enemy.xp)
+                
+                combat_result["result"] = "kill"
+                combat_result["xp_gained"] = enemy.xp
+                combat_result["enemy_type"] = enemy.type
+                combat_result["new_level"] = attacker.level
 
-        if not attacked_enemy:
+        if enemy_id is None:
             combat_result = {"result": "miss", "reason": "No enemy nearby."}
 
         return combat_result
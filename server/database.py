@@ -2,13 +2,36 @@
 # Isekai Online - SQLite Database Manager (Accounts + Players)
 # ===============================================================
 
+import asyncio
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 import bcrypt
 
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+
+# Config constants
+PASSWORD_HASH_WORKERS = cfg.PASSWORD_HASH_WORKERS
+LOGIN_QUEUE_LIMIT = cfg.LOGIN_QUEUE_LIMIT
+DB_CACHE_SIZE_KB = cfg.DB_CACHE_SIZE_KB
+DB_STATEMENT_CACHE = cfg.DB_STATEMENT_CACHE
+
 
 DB_FILE = Path(__file__).resolve().parent / "isekai_online.db"
 
+# bcrypt releases the GIL while hashing, so a small thread pool keeps
+# the ~100-300 ms of work per login off the event loop.
+_hash_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
 
 def hash_password(password: str) -> str:
     """Return bcrypt hash of a string."""
@@ -18,23 +41,118 @@ def hash_password(password: str) -> str:
     return hashed.decode('utf-8')
 
 
+def check_password(password: str, stored_hash: str) -> bool:
+    """True if password matches a stored bcrypt hash (which contains the salt)."""
+    return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bcrypt worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, hash_password, password)
+
+
+async def check_password_async(password: str, stored_hash: str) -> bool:
+    """check_password on the bcrypt worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, check_password, password, stored_hash)
+
+
+class LoginQueueFull(Exception):
+    """Raised when too many logins are already waiting for a hash worker."""
+
+
+class LoginQueue:
+    """Admission control for password checks.
+
+    At most max_active logins hash at once (one per worker) and at most
+    max_waiting wait behind them; anything beyond that is turned away
+    instead of piling up after a restart.
+
+        async with login_queue:
+            pid = await db.verify_login_async(user, pw)
+    """
+
+    def __init__(self, max_active: int = PASSWORD_HASH_WORKERS, max_waiting: int = LOGIN_QUEUE_LIMIT):
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(max_active)
+
+    async def __aenter__(self):
+        if self.waiting >= self.max_waiting:
+            raise LoginQueueFull()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._slots.release()
+
+
 class Database:
-    """SQLite helper: player persistence and account management."""
+    """SQLite helper: player persistence and account management.
 
-    def __init__(self):
+    The plain methods run on the calling thread. The *_async methods run
+    on one dedicated DB thread that owns its own connection, so awaiting
+    them never blocks the event loop and writes are naturally serialized.
+    Nothing touches the file until the first query, so constructing one
+    (e.g. at import time) has no side effects on disk.
+    """
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
         # Use a connection per thread approach using thread local storage
         self.connections = {}
-        self.create_tables()
+        self._lock = threading.Lock()
+        self._db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._setup_lock = threading.Lock()
+        self._tables_ready = False
+        self.wal = False  # see enable_wal()
 
     def _get_connection(self):
         """Get a thread-local database connection."""
-        import threading
         thread_id = threading.get_ident()
-        
-        if thread_id not in self.connections:
-            self.connections[thread_id] = sqlite3.connect(DB_FILE)
-        return self.connections[thread_id]
-    
+        conn = self.connections.get(thread_id)
+        if conn is None:
+            # check_same_thread is off only so close() can run from any thread
+            conn = sqlite3.connect(
+                self.db_file,
+                check_same_thread=False,
+                cached_statements=DB_STATEMENT_CACHE,  # reuse prepared statements per SQL string
+            )
+            if self.wal:
+                # WAL lets readers proceed while the DB thread writes; NORMAL sync
+                # is still crash-safe under WAL and avoids an fsync per commit.
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{int(DB_CACHE_SIZE_KB)}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            with self._lock:
+                self.connections[thread_id] = conn
+            self._ensure_tables(conn)
+        return conn
+
+    def enable_wal(self):
+        """Use WAL journaling for connections opened from now on.
+
+        WAL mode is stored in the database file itself, so only the
+        running server opts in (before its first query); tools that
+        merely import the player module leave the file's mode alone.
+        """
+        self.wal = True
+
+    def _ensure_tables(self, conn):
+        """Create the schema once, on whichever connection is opened first."""
+        if self._tables_ready:
+            return
+        with self._setup_lock:
+            if not self._tables_ready:
+                self._create_tables(conn)
+                self._tables_ready = True
+
     def _execute_query(self, query, params=None):
         """Execute a query safely."""
         conn = self._get_connection()
@@ -49,13 +167,20 @@ class Database:
         """Commit on current thread connection."""
         conn = self._get_connection()
         conn.commit()
+
+    async def _run(self, fn, *args):
+        """Run a blocking method on the DB thread and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_thread, partial(fn, *args))
     
     # -----------------------------------------------------------
     # Table Setup
     # -----------------------------------------------------------
     def create_tables(self):
-        # Using _execute_query for each statement for thread safety
-        self._execute_query(
+        self._create_tables(self._get_connection())
+
+    def _create_tables(self, conn):
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS accounts (
                 username TEXT PRIMARY KEY,
@@ -64,7 +189,7 @@ class Database:
             )
             """
         )
-        self._execute_query(
+        conn.execute(
             """
             CREATE TABLE IF NOT EXISTS players (
                 id TEXT PRIMARY KEY,
@@ -76,65 +201,106 @@ class Database:
             )
             """
         )
-        self._commit()
+        conn.commit()
 
     # -----------------------------------------------------------
     # Account Management
     # -----------------------------------------------------------
     def create_account(self, username: str, password: str, player_id: str):
         """Registers a new account."""
-        self.cursor.execute(
+        self.create_account_hashed(username, hash_password(password), player_id)
+
+    def create_account_hashed(self, username: str, password_hash: str, player_id: str):
+        """Registers a new account from an already computed bcrypt hash."""
+        self._execute_query(
             "INSERT INTO accounts (username, password, player_id) VALUES (?, ?, ?)",
-            (username, hash_password(password), player_id),
+            (username, password_hash, player_id),
+        )
+        self._commit()
+
+    def create_account_if_free(self, username: str, password_hash: str, player_id: str) -> bool:
+        """Insert the account unless the name is taken; False if it was."""
+        cursor = self._execute_query(
+            "INSERT OR IGNORE INTO accounts (username, password, player_id) VALUES (?, ?, ?)",
+            (username, password_hash, player_id),
         )
-        self.conn.commit()
+        self._commit()
+        return cursor.rowcount == 1
+
+    async def create_account_async(self, username: str, password_hash: str, player_id: str) -> bool:
+        return await self._run(self.create_account_if_free, username, password_hash, player_id)
 
     def account_exists(self, username: str) -> bool:
         cursor = self._execute_query("SELECT username FROM accounts WHERE username=?", (username,))
         return cursor.fetchone() is not None
 
+    async def account_exists_async(self, username: str) -> bool:
+        return await self._run(self.account_exists, username)
+
     def verify_login(self, username: str, password: str):
         """Check credentials and return linked player_id if valid."""
-        cursor = self._execute_query(
-            "SELECT player_id, password FROM accounts WHERE username=?", (username,)
-        )
-        row = cursor.fetchone()
+        row = self._get_credentials(username)
+        if not row:
+            return None  # username not found
+        player_id, stored_hash = row
+        if check_password(password, stored_hash):
+            return player_id
+        return None
+
+    async def verify_login_async(self, username: str, password: str):
+        """verify_login with the lookup on the DB thread and bcrypt on the hash pool."""
+        row = await self._run(self._get_credentials, username)
         if not row:
             return None  # username not found
         player_id, stored_hash = row
-        # bcrypt needs the stored hash (which contains the salt) to verify
-        password_bytes = password.encode('utf-8')
-        stored_hash_bytes = stored_hash.encode('utf-8')
-        if bcrypt.checkpw(password_bytes, stored_hash_bytes):
+        if await check_password_async(password, stored_hash):
             return player_id
         return None
 
+    def _get_credentials(self, username: str):
+        cursor = self._execute_query(
+            "SELECT player_id, password FROM accounts WHERE username=?", (username,)
+        )
+        return cursor.fetchone()
+
     # -----------------------------------------------------------
     # Player Management
     # -----------------------------------------------------------
-    def save_player(self, player_id, data):
-        self._execute_query(
-            """
-            INSERT INTO players (id, class, level, xp, hp, max_hp)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET
-                class=excluded.class,
-                level=excluded.level,
-                xp=excluded.xp,
-                hp=excluded.hp,
-                max_hp=excluded.max_hp
-            """,
-            (
-                player_id,
-                data.get("class", "warrior"),
-                data.get("lvl", 1),
-                data.get("xp", 0),
-                data.get("hp", 100),
-                data.get("max_hp", 100),
-            ),
+    SAVE_PLAYER_SQL = """
+        INSERT INTO players (id, class, level, xp, hp, max_hp)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            class=excluded.class,
+            level=excluded.level,
+            xp=excluded.xp,
+            hp=excluded.hp,
+            max_hp=excluded.max_hp
+        """
+
+    @staticmethod
+    def _player_row(player_id, data):
+        return (
+            player_id,
+            data.get("class", "warrior"),
+            data.get("lvl", 1),
+            data.get("xp", 0),
+            data.get("hp", 100),
+            data.get("max_hp", 100),
         )
+
+    def save_player(self, player_id, data):
+        self._execute_query(self.SAVE_PLAYER_SQL, self._player_row(player_id, data))
         self._commit()
 
+    def save_players(self, batch):
+        """Save many (player_id, data) pairs in a single transaction."""
+        conn = self._get_connection()
+        with conn:  # commits once, or rolls back everything on error
+            conn.executemany(self.SAVE_PLAYER_SQL, [self._player_row(pid, data) for pid, data in batch])
+
+    async def save_players_async(self, batch):
+        await self._run(self.save_players, batch)
+
     def load_player(self, player_id):
         cursor = self._execute_query("SELECT * FROM players WHERE id=?", (player_id,))
         row = cursor.fetchone()
@@ -149,13 +315,17 @@ class Database:
             "max_hp": max_hp,
         }
 
+    async def load_player_async(self, player_id):
+        return await self._run(self.load_player, player_id)
+
     def delete_player(self, player_id):
         self._execute_query("DELETE FROM players WHERE id=?", (player_id,))
         self._commit()
 
     def close(self):
-        """Close all thread connections."""
-        for conn in self.connections.values():
+        """Stop the DB thread and close all thread connections."""
+        self._db_thread.shutdown(wait=True)  # let queued writes finish first
+        for conn in list(self.connections.values()):
             try:
                 conn.close()
             except Exception:
@@ -1,82 +1,358 @@
 # ===============================================================
 # Isekai Online - Enemy System with Multiple Types
 # ===============================================================
-import uuid
+import itertools
+import json
 import random
-from typing import Dict, List
+from collections import deque, namedtuple
+from typing import Dict, List, Optional, Set, Tuple
 
-from config import TILE_SIZE, CITY, CITY_SPAWN
-from shared.biome import is_safe_spawn
-from server.world import in_city
+from config import (
+    TILE_SIZE, CITY, CITY_SPAWN, ENEMY_DELTA_HISTORY,
+    SPATIAL_CELL_SIZE, ENEMY_MIN_SPACING, ENEMY_SPAWN_TRIES, INITIAL_ENEMY_COUNT,
+    ENEMY_TYPES_FILE, ENEMY_STAT_LEVELS, ENEMY_ZONE_POPULATION,
+)
+from shared.biome import BiomeRegion, region_for_rect
+from server.world import SpawnTable
+from server.respawn import RespawnScheduler
+
+
+# Built-in enemy types; ENEMY_TYPES_FILE can add to or override these
+BASE_ENEMY_TYPES = {
+    "slime": {
+        "hp": 25,
+        "attack": 5,
+        "xp": 35,
+        "speed": 2.0,
+        "color": (0, 200, 50),
+        "size": 32,
+        "level_variance": 1.0,  # HP growth per level
+    },
+    "goblin": {
+        "hp": 40,
+        "attack": 12,
+        "xp": 80,
+        "speed": 2.5,
+        "color": (100, 50, 30),
+        "size": 40,
+        "level_variance": 1.2,
+    },
+    "ogre": {
+        "hp": 120,
+        "attack": 20,
+        "xp": 200,
+        "speed": 1.2,
+        "color": (150, 80, 40),
+        "size": 64,
+        "level_variance": 1.4,
+    },
+    "demon_slime": {
+        "hp": 60,
+        "attack": 18,
+        "xp": 150,
+        "speed": 2.8,
+        "color": (180, 50, 100),
+        "size": 48,
+        "level_variance": 1.3,
+    },
+    "orc": {
+        "hp": 80,
+        "attack": 22,
+        "xp": 180,
+        "speed": 2.2,
+        "color": (100, 100, 50),
+        "size": 56,
+        "level_variance": 1.35,
+    },
+}
+TYPE_FIELDS = ("hp", "attack", "xp", "speed", "color", "size", "level_variance")
+
+# One precomputed row per (type, level), shared by every enemy it describes
+EnemyStats = namedtuple("EnemyStats", "type_id name level hp attack xp speed color size")
 
 
 class EnemyTypes:
-    """Registry for all enemy types with stats by level"""
-    
-    @staticmethod
-    def get_stats(enemy_type: str, level: int):
+    """Registry for all enemy types with stats by level.
+
+    Definitions are loaded once and every (type, level) row up to
+    ENEMY_STAT_LEVELS is scaled up front, so spawning is a dict lookup.
+    Unknown types fall back to slime, as they always have.
+    """
+
+    def __init__(self, definitions: Dict[str, dict] = BASE_ENEMY_TYPES, levels: int = ENEMY_STAT_LEVELS):
+        self.definitions = {}
+        for name, spec in definitions.items():
+            missing = [f for f in TYPE_FIELDS if f not in spec]
+            if missing:
+                raise ValueError(f"Enemy type {name!r} is missing {', '.join(missing)}")
+            self.definitions[name] = spec
+        if "slime" not in self.definitions:
+            raise ValueError("Enemy types must define 'slime' (the fallback type)")
+        self.names = tuple(self.definitions)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.table: Dict[Tuple[str, int], EnemyStats] = {}
+        for name in self.names:
+            for level in range(1, levels + 1):
+                self.table[(name, level)] = self._scale(name, level)
+
+    @classmethod
+    def load(cls, path=None) -> "EnemyTypes":
+        """Built-in types, with a designer JSON file merged over them if given."""
+        definitions = dict(BASE_ENEMY_TYPES)
+        if path:
+            with open(path) as f:
+                for name, spec in json.load(f).items():
+                    definitions[name] = {**definitions.get(name, {}), **spec}
+        return cls(definitions)
+
+    def _scale(self, name: str, level: int) -> EnemyStats:
+        """Scale stats based on level"""
+        stats = self.definitions[name]
+        return EnemyStats(
+            type_id=self.ids[name],
+            name=name,
+            level=level,
+            hp=int(stats["hp"] * (1 + stats["level_variance"] * (level - 1) * 0.2)),
+            attack=stats["attack"] + int(level * 2),
+            xp=stats["xp"] + level * 15,
+            speed=stats["speed"] * (1 + level * 0.05),
+            color=tuple(stats["color"]),
+            size=stats["size"],
+        )
+
+    def stats(self, enemy_type: str, level: int) -> EnemyStats:
+        """Precomputed row for a type and level"""
+        row = self.table.get((enemy_type, level))
+        if row is None:
+            name = enemy_type if enemy_type in self.definitions else "slime"
+            row = self.table.get((name, level))
+            if row is None:
+                row = self.table[(name, level)] = self._scale(name, level)  # past ENEMY_STAT_LEVELS
+        return row
+
+    def get_stats(self, enemy_type: str, level: int) -> dict:
         """Get stats for an enemy type based on level scaling"""
-        base_stats = {
-            "slime": {
-                "hp": 25,
-                "attack": 5,
-                "xp": 35,
-                "speed": 2.0,
-                "color": (0, 200, 50),
-                "size": 32,
-                "level_variance": 1.0,  # HP growth per level
-            },
-            "goblin": {
-                "hp": 40,
-                "attack": 12,
-                "xp": 80,
-                "speed": 2.5,
-                "color": (100, 50, 30),
-                "size": 40,
-                "level_variance": 1.2,
-            },
-            "ogre": {
-                "hp": 120,
-                "attack": 20,
-                "xp": 200,
-                "speed": 1.2,
-                "color": (150, 80, 40),
-                "size": 64,
-                "level_variance": 1.4,
-            },
-            "demon_slime": {
-                "hp": 60,
-                "attack": 18,
-                "xp": 150,
-                "speed": 2.8,
-                "color": (180, 50, 100),
-                "size": 48,
-                "level_variance": 1.3,
-            },
-            "orc": {
-                "hp": 80,
-                "attack": 22,
-                "xp": 180,
-                "speed": 2.2,
-                "color": (100, 100, 50),
-                "size": 56,
-                "level_variance": 1.35,
-            },
-        }
-        
-        stats = base_stats.get(enemy_type, base_stats["slime"])
-        
-        # Scale stats based on level
-        scaled_stats = {
-            "hp": int(stats["hp"] * (1 + stats["level_variance"] * (level - 1) * 0.2)),
-            "attack": stats["attack"] + int(level * 2),
-            "xp": stats["xp"] + level * 15,
-            "speed": stats["speed"] * (1 + level * 0.05),
-            "color": stats["color"],
-            "size": stats["size"],
+        row = self.stats(enemy_type, level)
+        return {"hp": row.hp, "attack": row.attack, "xp": row.xp, "speed": row.speed,
+                "color": row.color, "size": row.size}
+
+
+enemy_types = EnemyTypes.load(ENEMY_TYPES_FILE)
+
+
+# -----------------------------------------------------------
+# Compact enemy records
+# -----------------------------------------------------------
+class Enemy:
+    """One live enemy: position, hp and a shared EnemyStats row, in slots.
+
+    Everything fixed by type and level (max hp, attack, xp, speed,
+    colour, size) lives once in the registry's table.
+    record() builds the wire/delta dict clients have always received.
+    zone names the SpawnZone it counts toward (None for replicas).
+    """
+
+    __slots__ = ("stats", "x", "y", "hp", "zone")
+
+    def __init__(self, stats: EnemyStats, x: float, y: float, hp: int = None, zone: str = None):
+        self.stats = stats
+        self.x = x
+        self.y = y
+        self.hp = stats.hp if hp is None else hp
+        self.zone = zone
+
+    @classmethod
+    def create(cls, enemy_type: str, level: int, x: float, y: float, zone: str = None) -> "Enemy":
+        return cls(enemy_types.stats(enemy_type, level), x, y, zone=zone)
+
+    @classmethod
+    def from_record(cls, r: dict) -> "Enemy":
+        return cls(enemy_types.stats(r["type"], r["lvl"]), r["x"], r["y"], r["hp"])
+
+    @property
+    def type(self) -> str:
+        return self.stats.name
+
+    @property
+    def type_id(self) -> int:
+        return self.stats.type_id
+
+    @property
+    def lvl(self) -> int:
+        return self.stats.level
+
+    @property
+    def max_hp(self) -> int:
+        return self.stats.hp
+
+    @property
+    def attack(self) -> int:
+        return self.stats.attack
+
+    @property
+    def xp(self) -> int:
+        return self.stats.xp
+
+    @property
+    def speed(self) -> float:
+        return self.stats.speed
+
+    def record(self) -> dict:
+        st = self.stats
+        return {
+            "type": st.name,
+            "x": self.x,
+            "y": self.y,
+            "hp": self.hp,
+            "max_hp": st.hp,
+            "attack": st.attack,
+            "xp": st.xp,
+            "speed": st.speed,
+            "color": st.color,
+            "lvl": st.level,
+            "size": st.size,
         }
-        
-        return scaled_stats
+
+
+class SpatialHash:
+    """Uniform grid index of entity ids by position.
+
+    Queries only visit the cells overlapping the query shape, so their
+    cost follows the number of nearby entities, not the world population.
+    """
+
+    def __init__(self, cell_size: float = SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Set[str]] = {}
+        self.positions: Dict[str, Tuple[float, float]] = {}
+        self.cell_of: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, eid):
+        return eid in self.positions
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, eid: str, x: float, y: float):
+        self.move(eid, x, y)
+
+    def move(self, eid: str, x: float, y: float):
+        """Update an entity's position, re-bucketing it only when it changes cell."""
+        self.positions[eid] = (x, y)
+        cell = self._cell(x, y)
+        old = self.cell_of.get(eid)
+        if old == cell:
+            return
+        if old is not None:
+            self._discard(old, eid)
+        self.cells.setdefault(cell, set()).add(eid)
+        self.cell_of[eid] = cell
+
+    def remove(self, eid: str):
+        cell = self.cell_of.pop(eid, None)
+        if cell is not None:
+            self._discard(cell, eid)
+        self.positions.pop(eid, None)
+
+    def _discard(self, cell, eid):
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.discard(eid)
+            if not bucket:
+                del self.cells[cell]
+
+    def _candidates(self, x0: float, y0: float, x1: float, y1: float):
+        """Yield ids in every cell overlapping the rectangle."""
+        c0, r0 = self._cell(x0, y0)
+        c1, r1 = self._cell(x1, y1)
+        cells = self.cells
+        for c in range(c0, c1 + 1):
+            for r in range(r0, r1 + 1):
+                bucket = cells.get((c, r))
+                if bucket:
+                    yield from bucket
+
+    # -----------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------
+    def query_radius(self, x: float, y: float, radius: float) -> List[str]:
+        """Ids strictly closer than radius to (x, y)."""
+        r2 = radius * radius
+        pos = self.positions
+        found = []
+        for eid in self._candidates(x - radius, y - radius, x + radius, y + radius):
+            ex, ey = pos[eid]
+            if (ex - x) * (ex - x) + (ey - y) * (ey - y) < r2:
+                found.append(eid)
+        return found
+
+    def any_within(self, x: float, y: float, radius: float) -> bool:
+        """True if some id is strictly closer than radius; stops at the first."""
+        r2 = radius * radius
+        pos = self.positions
+        for eid in self._candidates(x - radius, y - radius, x + radius, y + radius):
+            ex, ey = pos[eid]
+            if (ex - x) * (ex - x) + (ey - y) * (ey - y) < r2:
+                return True
+        return False
+
+    def query_radius_d2(self, x: float, y: float, radius: float) -> List[Tuple[str, float]]:
+        """(id, squared distance) for ids strictly closer than radius."""
+        r2 = radius * radius
+        pos = self.positions
+        found = []
+        for eid in self._candidates(x - radius, y - radius, x + radius, y + radius):
+            ex, ey = pos[eid]
+            d2 = (ex - x) * (ex - x) + (ey - y) * (ey - y)
+            if d2 < r2:
+                found.append((eid, d2))
+        return found
+
+    def nearest(self, x: float, y: float, radius: float) -> Optional[str]:
+        """Closest id strictly within radius of (x, y), or None."""
+        best, best_d2 = None, radius * radius
+        pos = self.positions
+        for eid in self._candidates(x - radius, y - radius, x + radius, y + radius):
+            ex, ey = pos[eid]
+            d2 = (ex - x) * (ex - x) + (ey - y) * (ey - y)
+            if d2 < best_d2:
+                best, best_d2 = eid, d2
+        return best
+
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float) -> List[str]:
+        """Ids inside the axis-aligned rectangle (inclusive)."""
+        pos = self.positions
+        return [
+            eid for eid in self._candidates(x0, y0, x1, y1)
+            if x0 <= pos[eid][0] <= x1 and y0 <= pos[eid][1] <= y1
+        ]
+
+    def query_segment(self, x0: float, y0: float, x1: float, y1: float, half_width: float) -> List[str]:
+        """Ids within half_width of the segment, measured perpendicular to it.
+
+        Only entities whose projection falls between the two end points
+        count, so nothing behind the start point is hit.
+        """
+        dx, dy = x1 - x0, y1 - y0
+        length2 = dx * dx + dy * dy
+        if length2 == 0:
+            return self.query_radius(x0, y0, half_width)
+        w2 = half_width * half_width
+        pos = self.positions
+        found = []
+        for eid in self._candidates(min(x0, x1) - half_width, min(y0, y1) - half_width,
+                                    max(x0, x1) + half_width, max(y0, y1) + half_width):
+            ex, ey = pos[eid]
+            t = ((ex - x0) * dx + (ey - y0) * dy) / length2
+            if not 0 < t <= 1:
+                continue
+            px, py = x0 + t * dx - ex, y0 + t * dy - ey
+            if px * px + py * py < w2:
+                found.append(eid)
+        return found
 
 
 class SpawnZone:
@@ -91,15 +367,44 @@ class SpawnZone:
         self.enemy_types = enemy_types
         self.min_level = min_level
         self.max_level = max_level
+        self._terrain: Optional[BiomeRegion] = None
+        self._spawns: Optional[SpawnTable] = None
+
+    def terrain(self) -> BiomeRegion:
+        """Biome/blocked masks for every tile in the zone, classified once."""
+        if self._terrain is None:
+            self._terrain = region_for_rect(self.x_min, self.y_min, self.x_max, self.y_max)
+        return self._terrain
+
+    def spawn_points(self) -> SpawnTable:
+        """Open ground outside the castle, precomputed once for O(1) picks."""
+        if self._spawns is None:
+            self._spawns = SpawnTable(self.x_min, self.y_min, self.x_max, self.y_max,
+                                      region=self.terrain())
+        return self._spawns
 
 
 class EnemyManager:
     """Enhanced enemy management with zones and types"""
     
-    def __init__(self):
-        self.enemies: Dict[str, dict] = {}
+    def __init__(self, id_prefix: str = ""):
+        self.enemies: Dict[str, Enemy] = {}
+        self.index = SpatialHash()  # enemy id -> position, kept in sync with self.enemies
+        self.id_prefix = id_prefix  # keeps ids unique across zone shards
+        # Sequential ids: random 4-char ids start colliding at a few thousand enemies
+        self._ids = itertools.count(1)
         self.zones: List[SpawnZone] = []
         self.setup_world_zones()
+        self.population: Dict[str, int] = {}  # zone name -> live enemies spawned there
+        self.respawns = RespawnScheduler(self)
+
+        # Delta tracking: changes since the last commit_delta() call
+        self.seq = 0
+        self._dirty: Dict[str, Set[str]] = {}
+        self._spawned: Set[str] = set()
+        self._despawned: Set[str] = set()
+        # (seq, spawned {id: record}, updated {id: {field: value}}, despawned set)
+        self._history = deque(maxlen=ENEMY_DELTA_HISTORY)
         
     def setup_world_zones(self):
         """Set up the different zones with appropriate enemies"""
@@ -162,9 +467,9 @@ class EnemyManager:
     
     def spawn_enemy(self, zone: SpawnZone = None):
         """Spawn a single enemy, optionally in a specific zone"""
-        # If no zone specified, pick one based on probability
+        # If no zone specified, pick one that has enemies to spawn
         if zone is None:
-            zone = random.choice(self.zones)
+            zone = random.choice([z for z in self.zones if z.enemy_types] or self.zones)
         
         # Skip if zone has no enemy types
         if not zone.enemy_types:
@@ -173,48 +478,160 @@ class EnemyManager:
         enemy_type = random.choice(zone.enemy_types)
         level = random.randint(zone.min_level, zone.max_level)
         
-        # Try many times to find a safe position
-        for _ in range(120):
-            x, y = random.uniform(zone.x_min, zone.x_max), random.uniform(zone.y_min, zone.y_max)
-            
-            # Must be safe terrain and NOT inside the castle
-            if is_safe_spawn(x, y) and not in_city(x, y):
-                enemy_id = str(uuid.uuid4())[:4]
-                stats = EnemyTypes.get_stats(enemy_type, level)
-                
-                self.enemies[enemy_id] = {
-                    "type": enemy_type,
-                    "x": x,
-                    "y": y,
-                    "hp": stats["hp"],
-                    "max_hp": stats["hp"],
-                    "attack": stats["attack"],
-                    "xp": stats["xp"],
-                    "speed": stats["speed"],
-                    "color": stats["color"],
-                    "lvl": level,
-                    "size": stats["size"],
-                }
-                return enemy_id
-        return None
+        # Every pick is open ground outside the castle; only spacing can reject one
+        spawns = zone.spawn_points()
+        for _ in range(ENEMY_SPAWN_TRIES):
+            pos = spawns.pick()
+            if pos is None:
+                return None  # no open ground in this zone at all
+            if not self.index.any_within(pos[0], pos[1], ENEMY_MIN_SPACING):
+                break
+        # A crowded zone still gets its enemy, just closer to a neighbour
+        x, y = pos
+        enemy_id = f"{self.id_prefix}{next(self._ids):x}"
+        self.enemies[enemy_id] = Enemy.create(enemy_type, level, x, y, zone.name)
+        self.index.insert(enemy_id, x, y)
+        self._spawned.add(enemy_id)
+        self.population[zone.name] = self.population.get(zone.name, 0) + 1
+        return enemy_id
     
-    def spawn_initial_enemies(self count=75):
-        """Spawn multiple enemies at startup"""
-        for _ in range(count):
-            self.spawn_enemy()
+    def spawn_initial_enemies(self, count=INITIAL_ENEMY_COUNT):
+        """Set each zone's population target and fill it at startup"""
+        zones = [z for z in self.zones if z.enemy_types]
+        for i, zone in enumerate(zones):
+            # count is split evenly unless config pins this zone's population
+            share = count // len(zones) + (1 if i < count % len(zones) else 0)
+            target = ENEMY_ZONE_POPULATION.get(zone.name, share)
+            self.respawns.targets[zone.name] = target
+            for _ in range(target - self.population.get(zone.name, 0)):
+                self.spawn_enemy(zone)
     
     def remove_enemy(self, enemy_id: str):
-        """Remove an enemy when defeated"""
-        self.enemies.pop(enemy_id, None)
+        """Remove an enemy from the world (no replacement)"""
+        enemy = self.enemies.pop(enemy_id, None)
+        if enemy is None:
+            return
+        if enemy.zone is not None:
+            self.population[enemy.zone] -= 1
+        self.index.remove(enemy_id)
+        self._dirty.pop(enemy_id, None)
+        if enemy_id in self._spawned:
+            self._spawned.discard(enemy_id)  # never seen by anyone
+        else:
+            self._despawned.add(enemy_id)
     
-    def respawn_enemy(self):
-        """Respawn one new enemy where one died"""
-        self.spawn_enemy()
+    def move_enemy(self, enemy_id: str, x: float, y: float):
+        """Move an enemy, keeping the spatial index and delta tracking in sync"""
+        enemy = self.enemies.get(enemy_id)
+        if enemy is None:
+            return
+        enemy.x, enemy.y = x, y
+        self.index.move(enemy_id, x, y)
+        self.mark_dirty(enemy_id, "x", "y")
+
+    def enemies_in_radius(self, x: float, y: float, radius: float) -> List[str]:
+        """Ids of enemies strictly within radius of (x, y)"""
+        return self.index.query_radius(x, y, radius)
+
+    def nearest_enemy(self, x: float, y: float, radius: float) -> Optional[str]:
+        """Id of the closest enemy within radius, or None"""
+        return self.index.nearest(x, y, radius)
+
+    def enemies_in_rect(self, x0: float, y0: float, x1: float, y1: float) -> List[str]:
+        """Ids of enemies inside a world rectangle"""
+        return self.index.query_rect(x0, y0, x1, y1)
+
+    def enemies_on_segment(self, x0: float, y0: float, x1: float, y1: float, half_width: float) -> List[str]:
+        """Ids of enemies along a line from (x0, y0) to (x1, y1)"""
+        return self.index.query_segment(x0, y0, x1, y1, half_width)
+
+    def kill_enemy(self, enemy_id: str):
+        """Remove a defeated enemy and schedule its zone's replacement"""
+        enemy = self.enemies.get(enemy_id)
+        if enemy is None:
+            return
+        self.remove_enemy(enemy_id)
+        self.respawns.schedule(enemy.zone)
     
-    def get_state(self) -> Dict:
-        """Return full enemy dictionary for sync with clients"""
+    def get_state(self) -> Dict[str, Enemy]:
+        """Return the live enemies; call record() on one for its wire form"""
         return self.enemies
+
+    # -----------------------------------------------------------
+    # Delta compression
+    # -----------------------------------------------------------
+    def mark_dirty(self, enemy_id: str, *fields: str):
+        """Flag fields of an enemy (e.g. "hp", "x", "y") as changed."""
+        if enemy_id in self.enemies and enemy_id not in self._spawned:
+            self._dirty.setdefault(enemy_id, set()).update(fields)
+
+    def commit_delta(self) -> int:
+        """Close the current change set (once per tick) and return the latest seq."""
+        if not (self._dirty or self._spawned or self._despawned):
+            return self.seq
+        self.seq += 1
+        spawned = {eid: self.enemies[eid].record() for eid in self._spawned}
+        updated = {
+            eid: {f: getattr(self.enemies[eid], f) for f in fields}
+            for eid, fields in self._dirty.items()
+        }
+        self._history.append((self.seq, spawned, updated, self._despawned))
+        self._dirty = {}
+        self._spawned = set()
+        self._despawned = set()
+        return self.seq
+
+    def last_delta(self) -> Optional[Tuple[Dict, Dict, Set[str]]]:
+        """(spawned, updated, despawned) of the latest commit, or None."""
+        if not self._history:
+            return None
+        return self._history[-1][1:]
+
+    def apply_delta(self, spawned: Dict, updated: Dict, despawned: Set[str]):
+        """Replay a change set committed by another EnemyManager (a zone shard).
+
+        The changes are tracked here like local ones, so this manager's own
+        commit_delta()/delta_since() keep working for client fan-out.
+        """
+        for eid, record in spawned.items():
+            self.enemies[eid] = Enemy.from_record(record)
+            self.index.insert(eid, record["x"], record["y"])
+            self._spawned.add(eid)
+        for eid, fields in updated.items():
+            enemy = self.enemies.get(eid)
+            if enemy is None:
+                continue
+            for field, value in fields.items():
+                setattr(enemy, field, value)
+            if "x" in fields or "y" in fields:
+                self.index.move(eid, enemy.x, enemy.y)
+            self.mark_dirty(eid, *fields)
+        for eid in despawned:
+            self.remove_enemy(eid)
+
+    def delta_since(self, ack_seq: int) -> Optional[Dict]:
+        """Merge every committed change after ack_seq into one delta.
+
+        Returns {"seq", "spawn", "update", "despawn"}, or None when ack_seq
+        is older than the kept history and the client needs a full resync.
+        """
+        delta = {"seq": self.seq, "spawn": {}, "update": {}, "despawn": set()}
+        if ack_seq >= self.seq:
+            return delta
+        if not self._history or ack_seq < self._history[0][0] - 1:
+            return None
+        for seq, spawned, updated, despawned in self._history:
+            if seq <= ack_seq:
+                continue
+            delta["spawn"].update(spawned)
+            for eid, fields in updated.items():
+                delta["update"].setdefault(eid, {}).update(fields)
+            for eid in despawned:
+                delta["spawn"].pop(eid, None)
+                delta["update"].pop(eid, None)
+                delta["despawn"].add(eid)
+        return delta
     
     def get_enemies_by_type(self, enemy_type: str) -> List:
         """Get all enemies of a specific type"""
-        return [eid for eid, e in self.enemies.items() if e["type"] == enemy_type]
\ No newline at end of file
+        return [eid for eid, e in self.enemies.items() if e.stats.name == enemy_type]
\ No newline at end of file
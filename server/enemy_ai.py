@@ -0,0 +1,135 @@
+# ===============================================================
+# Isekai Online - Enemy AI (aggro, chase, melee)
+# ===============================================================
+# One simulation step per server tick. Work is driven from the players
+# outward: each player wakes the enemies inside its aggro radius via
+# the spatial hash, so enemies with nobody around sleep at zero cost no
+# matter how many exist. Awake enemies chase their nearest player, stay
+# leashed to where they were first woken, and swing on a cooldown.
+# Movement goes through EnemyManager.move_enemy, so positions reach
+# clients in the regular per-tick enemy delta. Hits are returned rather
+# than applied: players are owned by whoever runs the game server.
+
+from typing import Dict, List, Tuple
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+from shared.biome import is_blocked
+from server.world import in_city
+
+# Config constants
+SERVER_TICK_RATE = cfg.SERVER_TICK_RATE
+ENEMY_AGGRO_RADIUS = cfg.ENEMY_AGGRO_RADIUS
+ENEMY_LEASH_RADIUS = cfg.ENEMY_LEASH_RADIUS
+ENEMY_ATTACK_RANGE = cfg.ENEMY_ATTACK_RANGE
+ENEMY_ATTACK_COOLDOWN = cfg.ENEMY_ATTACK_COOLDOWN
+ENEMY_SPEED_SCALE = cfg.ENEMY_SPEED_SCALE
+
+PRUNE_EVERY = SERVER_TICK_RATE * 5  # ticks between dropping state of dead enemies
+
+
+class EnemyAI:
+    """Per-tick enemy behaviour over an EnemyManager."""
+
+    def __init__(self, enemy_manager, tick_rate: float = SERVER_TICK_RATE):
+        self.enemies = enemy_manager
+        self.dt = 1.0 / tick_rate
+        self.cooldown_ticks = max(1, round(ENEMY_ATTACK_COOLDOWN * tick_rate))
+        self.tick = 0
+        self.home: Dict[str, Tuple[float, float]] = {}   # eid -> where it was first woken
+        self.ready_at: Dict[str, int] = {}               # eid -> tick it may attack again
+        self.chasing = set()                             # enemies that moved toward a target last tick
+        self.returning = set()                           # untargeted enemies walking home
+        self.awake = 0
+
+    # -----------------------------------------------------------
+    def step(self, players) -> List[Tuple[str, str, int]]:
+        """Advance one tick. players: {pid: obj with x, y}.
+
+        Returns the hits landed this tick as (enemy_id, player_id, attack).
+        """
+        self.tick += 1
+        enemies = self.enemies.enemies
+        index = self.enemies.index
+
+        # Wake pass: nearest player per enemy, only around players
+        targets: Dict[str, Tuple[float, str]] = {}
+        for pid, p in players.items():
+            px, py = p.x, p.y
+            if in_city(px, py):
+                continue  # the castle is a safe zone
+            for eid, d2 in index.query_radius_d2(px, py, ENEMY_AGGRO_RADIUS):
+                best = targets.get(eid)
+                if best is None or d2 < best[0]:
+                    targets[eid] = (d2, pid)
+        self.awake = len(targets)
+
+        # Enemies whose target got away walk back instead of freezing in place
+        for eid in self.chasing:
+            if eid not in targets and eid in enemies:
+                self.returning.add(eid)
+        self.chasing = set()
+
+        hits = []
+        reach2 = ENEMY_ATTACK_RANGE * ENEMY_ATTACK_RANGE
+        leash2 = ENEMY_LEASH_RADIUS * ENEMY_LEASH_RADIUS
+        for eid, (d2, pid) in targets.items():
+            enemy = enemies[eid]
+            hx, hy = self.home.setdefault(eid, (enemy.x, enemy.y))
+            p = players[pid]
+            if (p.x - hx) ** 2 + (p.y - hy) ** 2 > leash2:
+                # Target is too far from this enemy's ground: give up
+                self.returning.add(eid)
+                continue
+            self.returning.discard(eid)
+            if d2 <= reach2:
+                if self.ready_at.get(eid, 0) <= self.tick:
+                    self.ready_at[eid] = self.tick + self.cooldown_ticks
+                    hits.append((eid, pid, enemy.attack))
+            elif self._walk(eid, enemy, p.x, p.y, ENEMY_ATTACK_RANGE * 0.8):
+                self.chasing.add(eid)
+
+        for eid in list(self.returning):
+            enemy = enemies.get(eid)
+            if enemy is None:
+                self.returning.discard(eid)
+                continue
+            hx, hy = self.home[eid]
+            if not self._walk(eid, enemy, hx, hy, 1.0):
+                self.returning.discard(eid)  # home (or stuck): back to sleep
+
+        if self.tick % PRUNE_EVERY == 0:
+            self._prune()
+        return hits
+
+    def _walk(self, eid, enemy, tx, ty, stop_at: float) -> bool:
+        """Move an enemy one tick toward (tx, ty); False if it did not move."""
+        x, y = enemy.x, enemy.y
+        dx, dy = tx - x, ty - y
+        dist = (dx * dx + dy * dy) ** 0.5
+        if dist <= stop_at:
+            return False
+        step = min(enemy.speed * ENEMY_SPEED_SCALE * self.dt, dist - stop_at)
+        nx, ny = x + dx / dist * step, y + dy / dist * step
+        # Slide along obstacles instead of stopping dead at the first tree
+        for cx, cy in ((nx, ny), (nx, y), (x, ny)):
+            if not is_blocked(cx, cy) and not in_city(cx, cy):
+                # Rounded positions keep the delta small on the wire
+                cx, cy = round(cx, 1), round(cy, 1)
+                if (cx, cy) == (x, y):
+                    return False
+                self.enemies.move_enemy(eid, cx, cy)
+                return True
+        return False
+
+    def _prune(self):
+        """Forget AI state of enemies that died or despawned."""
+        enemies = self.enemies.enemies
+        for table in (self.home, self.ready_at):
+            for eid in [eid for eid in table if eid not in enemies]:
+                del table[eid]
@@ -0,0 +1,181 @@
+# ===============================================================
+# Isekai Online - Encode-Once Fan-Out
+# ===============================================================
+# With interest management every client gets its own TICK, which
+# naively means one json.dumps per recipient. TickEncoder serializes
+# each shared piece of a tick (a player's move, an event, an enemy
+# record) exactly once, assembles per-client packets from those
+# fragments, and hands recipients whose view signature matches the
+# very same encoded frames. JSON goes out as pre-encoded UTF-8 so the
+# websocket layer does not re-encode the string per socket either.
+
+import json
+from collections import namedtuple
+from typing import Dict, List, Tuple
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from shared import protocol
+
+
+class TextFrame(bytes):
+    """UTF-8 JSON encoded once; sent as a websocket text frame."""
+
+    @classmethod
+    def from_packet(cls, packet) -> "TextFrame":
+        return cls(json.dumps(packet).encode("utf-8"))
+
+    @classmethod
+    def from_str(cls, text: str) -> "TextFrame":
+        return cls(text.encode("utf-8"))
+
+
+# Frames ready to send; packet is the plain dict only for position-only
+# TICKs, so a send queue can still merge them with newer ones.
+Encoded = namedtuple("Encoded", "frames packet")
+
+
+def _key(k) -> str:
+    return json.dumps(k)
+
+
+class TickEncoder:
+    """Encode-once cache for one tick's fan-out.
+
+    moves:  {player_id: (x, y)} drained from the tick buffer
+    events: [(packet, pos)] drained from the tick buffer
+    """
+
+    def __init__(self, tick: int, moves: Dict, events: List[Tuple], players: Dict, enemies: Dict):
+        self.tick = tick
+        self.moves = moves
+        self.events = events
+        self.players = players
+        self.enemies = enemies
+        self._moves_json = {}
+        self._moves_bin = {}
+        self._events_json = {}
+        self._players_json = {}
+        self._enemies_json = {}
+        self._updates_json = {}
+        self.frames = {}  # view signature -> Encoded
+        self.built = 0
+        self.shared = 0
+
+    # -----------------------------------------------------------
+    # Fragments (each encoded at most once per tick)
+    # -----------------------------------------------------------
+    def move_json(self, mid) -> str:
+        frag = self._moves_json.get(mid)
+        if frag is None:
+            frag = self._moves_json[mid] = f"{_key(mid)}: {json.dumps(self.moves[mid])}"
+        return frag
+
+    def move_bin(self, mid):
+        """Packed MOVES entry, or False if this mover has no binary form."""
+        entry = self._moves_bin.get(mid)
+        if entry is None:
+            x, y = self.moves[mid]
+            try:
+                entry = protocol.pack_move(mid, x, y)
+            except (ValueError, OverflowError, UnicodeEncodeError):
+                entry = False
+            self._moves_bin[mid] = entry
+        return entry
+
+    def event_json(self, i) -> str:
+        frag = self._events_json.get(i)
+        if frag is None:
+            frag = self._events_json[i] = json.dumps(self.events[i][0])
+        return frag
+
+    def player_json(self, oid) -> str:
+        frag = self._players_json.get(oid)
+        if frag is None:
+            frag = self._players_json[oid] = f"{_key(oid)}: {json.dumps(self.players[oid].serialize())}"
+        return frag
+
+    def enemy_json(self, eid) -> str:
+        frag = self._enemies_json.get(eid)
+        if frag is None:
+            frag = self._enemies_json[eid] = f"{_key(eid)}: {json.dumps(self.enemies[eid].record())}"
+        return frag
+
+    def update_json(self, ack, eid, fields) -> str:
+        frag = self._updates_json.get((ack, eid))
+        if frag is None:
+            frag = self._updates_json[(ack, eid)] = f"{_key(eid)}: {json.dumps(fields)}"
+        return frag
+
+    # -----------------------------------------------------------
+    # Per-client packets
+    # -----------------------------------------------------------
+    def encode(self, codec, move_ids, event_ids, players_in, players_out, section, ack) -> Encoded:
+        """One client's TICK; clients with the same view signature share the result."""
+        sig = (codec, move_ids, event_ids, frozenset(players_in), frozenset(players_out),
+               _section_signature(section, ack))
+        encoded = self.frames.get(sig)
+        if encoded is not None:
+            self.shared += 1
+            return encoded
+        frames = self._build(codec, move_ids, event_ids, players_in, players_out, section, ack)
+        packet = None
+        if move_ids and not (event_ids or players_in or players_out or section):
+            packet = {"type": "TICK", "tick": self.tick, "moves": {mid: self.moves[mid] for mid in move_ids}}
+        encoded = self.frames[sig] = Encoded(frames, packet)
+        self.built += 1
+        return encoded
+
+    def _build(self, codec, move_ids, event_ids, players_in, players_out, section, ack):
+        head = f'{{"type": "TICK", "tick": {self.tick}'
+        body = []
+        frames = []
+        if move_ids:
+            entries = [self.move_bin(mid) for mid in move_ids] if codec == protocol.CODEC_BINARY else None
+            if entries and all(entries):
+                frames.append(protocol.moves_frame(entries))
+            else:
+                body.append(', "moves": {' + ", ".join(self.move_json(mid) for mid in move_ids) + "}")
+        if event_ids:
+            body.append(', "events": [' + ", ".join(self.event_json(i) for i in event_ids) + "]")
+        if players_in:
+            body.append(', "enter": {' + ", ".join(
+                self.player_json(oid) for oid in players_in if oid in self.players) + "}")
+        if players_out:
+            body.append(', "leave": ' + json.dumps(list(players_out)))
+        if section:
+            body.append(', "enemies": ' + self._section_json(section, ack))
+        if body:
+            frames.append(TextFrame.from_str(head + "".join(body) + "}"))
+        return tuple(frames)
+
+    def _section_json(self, section, ack) -> str:
+        parts = []
+        if section.get("reset"):
+            parts.append('"reset": true')
+        if "spawn" in section:
+            parts.append('"spawn": {' + ", ".join(self.enemy_json(eid) for eid in section["spawn"]) + "}")
+        if "update" in section:
+            parts.append('"update": {' + ", ".join(
+                self.update_json(ack, eid, fields) for eid, fields in section["update"].items()) + "}")
+        if "despawn" in section:
+            parts.append('"despawn": ' + json.dumps(section["despawn"]))
+        parts.append(f'"seq": {section["seq"]}')
+        return "{" + ", ".join(parts) + "}"
+
+
+def _section_signature(section, ack):
+    if not section:
+        return None
+    return (
+        ack,
+        section["seq"],
+        bool(section.get("reset")),
+        frozenset(section.get("spawn", ())),
+        frozenset(section.get("update", ())),
+        frozenset(section.get("despawn", ())),
+    )
@@ -0,0 +1,87 @@
+# ===============================================================
+# Isekai Online - Area of Interest (AOI) Manager
+# ===============================================================
+# Buckets players into a coarse world grid so the server only sends
+# each client the players, enemies and combat events within its view
+# radius, and tells it when entities enter or leave that radius.
+
+from typing import Dict, Set
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+from server.enemies import SpatialHash
+
+# Config constants
+AOI_CELL_SIZE = cfg.AOI_CELL_SIZE
+AOI_VIEW_RADIUS = cfg.AOI_VIEW_RADIUS
+
+
+class InterestManager:
+    """Grid-based interest management keyed on player x/y."""
+
+    def __init__(self, cell_size: float = AOI_CELL_SIZE, view_radius: float = AOI_VIEW_RADIUS):
+        self.view_radius = view_radius
+        self.grid = SpatialHash(cell_size)  # player id -> position
+        # viewer pid -> ids it currently knows about
+        self.views: Dict[str, Dict[str, Set[str]]] = {}
+
+    # -----------------------------------------------------------
+    # Player positions
+    # -----------------------------------------------------------
+    def add_player(self, pid: str, x: float, y: float):
+        self.views[pid] = {"players": set(), "enemies": set()}
+        self.grid.insert(pid, x, y)
+
+    def move_player(self, pid: str, x: float, y: float):
+        self.grid.move(pid, x, y)
+
+    def remove_player(self, pid: str):
+        self.grid.remove(pid)
+        self.views.pop(pid, None)
+
+    # -----------------------------------------------------------
+    # Queries
+    # -----------------------------------------------------------
+    def players_near(self, x: float, y: float, radius: float = None) -> Set[str]:
+        """All player ids within radius of (x, y), using only nearby cells."""
+        radius = self.view_radius if radius is None else radius
+        return set(self.grid.query_radius(x, y, radius))
+
+    def in_view(self, viewer: str, x: float, y: float) -> bool:
+        """True if world point (x, y) is inside the viewer's radius."""
+        pos = self.grid.positions.get(viewer)
+        if pos is None:
+            return False
+        return (pos[0] - x) ** 2 + (pos[1] - y) ** 2 < self.view_radius * self.view_radius
+
+    # -----------------------------------------------------------
+    # View tracking
+    # -----------------------------------------------------------
+    def update_view(self, viewer: str, enemy_index: SpatialHash):
+        """Recompute what a viewer can see.
+
+        Returns (players_entered, players_left, enemies_entered, enemies_left)
+        relative to the previous call for this viewer.
+        """
+        view = self.views.get(viewer)
+        pos = self.grid.positions.get(viewer)
+        if view is None or pos is None:
+            return set(), set(), set(), set()
+        players = self.players_near(*pos)
+        players.discard(viewer)
+        seen_enemies = set(enemy_index.query_radius(pos[0], pos[1], self.view_radius))
+
+        result = (
+            players - view["players"],
+            view["players"] - players,
+            seen_enemies - view["enemies"],
+            view["enemies"] - seen_enemies,
+        )
+        view["players"] = players
+        view["enemies"] = seen_enemies
+        return result
@@ -5,6 +5,7 @@
 import asyncio
 import json
 import threading
+import time
 import websockets
 
 import sys
@@ -16,13 +17,22 @@ if root_dir not in sys.path:
 
 # Import modules directly
 import config as cfg
-from server.player import PlayerManager
+from server.player import Player, PlayerManager, persistence, db
 from server.enemies import EnemyManager
 from server.combat_enhanced import EnhancedCombatSystem
-from server.database import Database
+from server.skills import SkillManager
+from server.database import LoginQueue, LoginQueueFull, hash_password_async
 from server.quest_enhanced import QuestState
 from server.npc import NPCManager
-# Shared story system
+from server.tick import TickBuffer
+from server.interest import InterestManager
+from server.metrics import ServerMetrics, frame_bytes
+from server.outbox import ClientOutbox
+from server.fanout import TickEncoder, TextFrame
+from server.shard import ZoneShards
+from server.enemy_ai import EnemyAI
+# Shared story system + wire protocol
+from shared import protocol
 from shared.story_enhanced import DIALOGUE_REGISTRY
 
 # Constants from config
@@ -30,10 +40,10 @@ HOST = cfg.HOST
 PORT = cfg.PORT
 MAX_MOVE_DISTANCE = cfg.MAX_MOVE_DISTANCE
 MOVEMENT_VALIDATION_TOLERANCE = cfg.MOVEMENT_VALIDATION_TOLERANCE
-
-
-# Shared database for accounts
-db = Database()
+SERVER_TICK_RATE = cfg.SERVER_TICK_RATE
+METRICS_DUMP_INTERVAL = cfg.METRICS_DUMP_INTERVAL
+ZONE_SHARDING = cfg.ZONE_SHARDING
+ENEMY_AI = cfg.ENEMY_AI
 
 
 class GameServer:
@@ -41,12 +51,38 @@ class GameServer:
 
     def __init__(self):
         self.clients = {}                 # websocket -> player_id
+        self.outboxes = {}                # websocket -> ClientOutbox (codec + send queue)
         self.player_manager = PlayerManager()
         self.enemy_manager = EnemyManager()
-        self.enemy_manager.spawn_initial_enemies()
         self.combat = EnhancedCombatSystem(self.player_manager, self.enemy_manager)
+        self.skills = SkillManager(self.player_manager, self.enemy_manager)
         self.quest_state = QuestState()
         self.npc_manager = NPCManager()
+        self.login_queue = LoginQueue()   # bounds concurrent bcrypt work
+        self.interest = InterestManager()
+        # Changes accumulated between simulation ticks
+        self.tick_buffer = TickBuffer()
+        self.tick_count = 0
+        self.enemy_acks = {}              # player_id -> last enemy delta seq it applied
+        self.metrics = ServerMetrics()
+        self.metrics.gauge("clients", lambda: len(self.clients))
+        self.metrics.gauge("enemies", lambda: len(self.enemy_manager.enemies))
+        self.metrics.gauge("login_queue_waiting", lambda: self.login_queue.waiting)
+        self.metrics.gauge("persistence", persistence.stats)
+        self.metrics.gauge("send_queue_max", lambda: max((o.depth for o in self.outboxes.values()), default=0))
+        # Sharded: zone workers own the enemies and this process only mirrors them
+        self.shards = None
+        self.enemy_ai = None
+        if ZONE_SHARDING:
+            self.shards = ZoneShards(self.player_manager, self.enemy_manager, self.metrics,
+                                     on_hits=self.apply_enemy_hits)
+            self.metrics.gauge("zone_shards", self.shards.stats)
+        else:
+            self.enemy_manager.spawn_initial_enemies()
+            self.metrics.gauge("respawns_pending", lambda: len(self.enemy_manager.respawns))
+            if ENEMY_AI:
+                self.enemy_ai = EnemyAI(self.enemy_manager)
+                self.metrics.gauge("enemies_awake", lambda: self.enemy_ai.awake)
 
     # -----------------------------------------------------------
     async def handler(self, websocket):
@@ -54,8 +90,10 @@ class GameServer:
         try:
             # First packet decides the session flow
             raw = await websocket.recv()
-            data = json.loads(raw)
+            data = protocol.decode(raw)
             cmd = data.get("type", "INIT")
+            # Clients list the codecs they understand; JSON is always the fallback
+            codec = protocol.negotiate(data.get("codecs"))
 
             player = None
             # -------- REGISTER flow --------
@@ -65,152 +103,88 @@ class GameServer:
                 class_name = data.get("class", "warrior")
 
                 if not username or not password:
-                    await websocket.send(json.dumps({"type": "LOGIN_FAIL", "reason": "Missing credentials"}))
+                    await self.send(websocket, json.dumps({"type": "LOGIN_FAIL", "reason": "Missing credentials"}))
                     return
 
-                if db.account_exists(username):
-                    await websocket.send(json.dumps({"type": "LOGIN_FAIL", "reason": "User exists"}))
+                if await db.account_exists_async(username):
+                    await self.send(websocket, json.dumps({"type": "LOGIN_FAIL", "reason": "User exists"}))
                     return
 
-                player = self.player_manager.create_player(class_name)
+                async with self.login_queue:
+                    password_hash = await hash_password_async(password)
+
+                # Claim the name atomically on the DB thread: another registration
+                # may have taken it while we hashed
+                player = Player(class_name, saved={})
                 pid = player.id
-                db.create_account(username, password, pid)
+                if not await db.create_account_async(username, password_hash, pid):
+                    await self.send(websocket, json.dumps({"type": "LOGIN_FAIL", "reason": "User exists"}))
+                    return
+                self.player_manager.players[pid] = player
 
             # -------- LOGIN flow --------
             elif cmd == "LOGIN":
                 username = data.get("username")
                 password = data.get("password")
-                pid_from_db = db.verify_login(username, password)
+                async with self.login_queue:
+                    pid_from_db = await db.verify_login_async(username, password)
                 if not pid_from_db:
-                    await websocket.send(json.dumps({"type": "LOGIN_FAIL", "reason": "Invalid credentials"}))
+                    await self.send(websocket, json.dumps({"type": "LOGIN_FAIL", "reason": "Invalid credentials"}))
                     return
 
-                player = self.player_manager.create_player("warrior", existing_id=pid_from_db)
+                player = await self.player_manager.create_player_async("warrior", existing_id=pid_from_db)
                 pid = player.id
 
             # -------- Legacy INIT (no accounts) --------
             else:  # "INIT"
                 class_name = data.get("class", "warrior")
-                player = self.player_manager.create_player(class_name)
+                player = await self.player_manager.create_player_async(class_name)
                 pid = player.id
 
             # Register client socket
+            if self.shards:
+                self.shards.enter(player)
             self.clients[websocket] = pid
+            self.outboxes[websocket] = ClientOutbox(websocket, codec, self.metrics).start()
+            self.enemy_acks[pid] = self.enemy_manager.seq
             print(f"[JOIN] Player {pid} connected.")
 
-            # Send world snapshot
+            # Send a snapshot of what is inside the new player's view;
+            # everything else arrives later as TICK enter notifications
+            self.interest.add_player(pid, player.x, player.y)
+            enemies = self.enemy_manager.get_state()
+            seen_players, _, seen_enemies, _ = self.interest.update_view(pid, self.enemy_manager.index)
+            state = {oid: self.player_manager.players[oid].serialize() for oid in seen_players}
+            state[pid] = player.serialize()
             # Give first quest to new players
             quest = self.quest_state.give_first_quest(pid)
-            await websocket.send(json.dumps({
+            await self.send(websocket, json.dumps({
                 "type": "INIT",
                 "id": pid,
-                "state": self.player_manager.get_state(),
-                "enemies": self.enemy_manager.get_state(),
+                "state": state,
+                "enemies": {eid: enemies[eid].record() for eid in seen_enemies},
+                "enemy_seq": self.enemy_manager.seq,
+                "codec": codec,
                 "npcs": self.npc_manager.get_state(),
                 "quest": quest
             }))
 
-            # Notify others
-            await self.broadcast(json.dumps({
-                "type": "JOIN",
-                "id": pid,
-                "data": player.serialize()
-            }), exclude=websocket)
+            # Others nearby see us enter on the next tick
+            self.tick_buffer.views_changed = True
 
             # ---------------- Main loop ----------------
             async for message in websocket:
-                msg = json.loads(message)
-                mtype = msg.get("type", "")
-
-                # Movement
-                if mtype == "MOVE":
-                    p = self.player_manager.players.get(pid)
-                    if not p:
-                        continue
-                    new_x, new_y = msg["x"], msg["y"]
-                    
-                    # Basic movement validation (prevent teleporting)
-                    dist = ((new_x - p.x) ** 2 + (new_y - p.y) ** 2) ** 0.5
-                    if dist > MAX_MOVE_DISTANCE:
-                        # Possible cheating or lag, send the current valid position back
-                        await websocket.send(json.dumps({
-                            "type": "CORRECT_POSITION",
-                            "x": p.x,
-                            "y": p.y
-                        }))
-                        continue
-                    
-                    # Update position with slight tolerance for network jitter
-                    p.x, p.y = new_x, new_y
-                    await self.broadcast(json.dumps({
-                        "type": "UPDATE", "id": pid, "x": p.x, "y": p.y
-                    }), exclude=websocket)
-
-                # Basic attack
-                elif mtype == "ATTACK":
-                    p = self.player_manager.players.get(pid)
-                    if not p:
-                        continue
-                    result = self.combat.player_attack(pid)
-                    # Handle quest progress if slime was killed
-                    if result.get("notify_type") == "SLIME_KILL":
-                        q = self.quest_state.increment(pid, "slime")
-                        if q:
-                            await websocket.send(json.dumps({"type": "QUEST_UPDATE", "quest": q}))
-                            if self.quest_state.check_complete(pid):
-                                # award XP
-                                if p:
-                                    p.add_xp(q["reward_xp"])
-                                    await websocket.send(json.dumps({"type": "QUEST_COMPLETE", "xp": q["reward_xp"], "p_data": p.serialize()}))
-                    
-                    await self.broadcast(json.dumps({
-                        "type": "COMBAT",
-                        "attacker": pid,
-                        "mobs": self.mob_manager.get_state(),
-                        "p_data": p.serialize(),
-                        "result": result
-                    }))
-
-                # Skills (auto by class if 'skill' missing)
-                elif mtype == "SKILL":
-                    from .skills import SkillManager
-                    sm = SkillManager(self.player_manager, self.mob_manager)
-                    skill_name = msg.get("skill")  # can be None -> auto by class
-                    result = sm.use_skill(pid, skill_name)
-                    await self.broadcast(json.dumps({
-                        "type": "SKILL_FX",
-                        "attacker": pid,
-                        "skill": result.get("skill", skill_name),
-                        "result": result,
-                        "mobs": self.mob_manager.get_state(),
-                        "players": self.player_manager.get_state()
-                    }))
-
-                # Chat
-                elif mtype == "CHAT":
-                    text = msg.get("text", "")
-                    packet = {"type": "CHAT", "id": pid, "text": text}
-                    await self.broadcast(json.dumps(packet))
-                
-                
-                # Dialogue requests when player is near NPC
-                elif mtype == "TALK_NPC":
-                    player = self.player_manager.players.get(pid)
-                    if player:
-                        npc_id, npc_data = self.npc_manager.nearby(player.x, player.y)
-                        if npc_id:
-                            # For simplicity send the entire dialogue block for now
-                            await websocket.send(json.dumps({
-                                "type": "DIALOGUE",
-                                "npc_id": npc_id,
-                                "npc_name": npc_data["name"],
-                                "dialogue_id": npc_data.get("dialogue")
-                            }))
+                start = time.perf_counter()
+                msg = protocol.decode(message)
+                await self.handle_message(websocket, pid, codec, msg)
+                self.metrics.record_message(msg.get("type", ""), frame_bytes(message), time.perf_counter() - start)
 
+        except LoginQueueFull:
+            await self.send(websocket, json.dumps({"type": "LOGIN_FAIL", "reason": "Server busy, try again"}))
         except websockets.exceptions.ConnectionClosed as e:
             print(f"[Server] Client disconnected gracefully: {e}")
-        except json.JSONDecodeError as e:
-            print(f"[Server] Invalid JSON from client: {e}")
+        except protocol.ProtocolError as e:
+            print(f"[Server] Invalid packet from client: {e}")
         except Exception as e:
             print(f"[Server Error in handler] Unexpected error: {e}")
             import traceback
@@ -220,27 +194,296 @@ class GameServer:
             if pid:
                 print(f"[LEAVE] Player {pid} disconnected.")
                 self.player_manager.remove_player(pid)
+                self.skills.forget(pid)
             if websocket in self.clients:
                 del self.clients[websocket]
-            await self.broadcast(json.dumps({"type": "LEAVE", "id": pid}))
+            outbox = self.outboxes.pop(websocket, None)
+            if outbox:
+                outbox.close()
+            self.tick_buffer.moves.pop(pid, None)
+            if self.shards and pid:
+                self.shards.leave(pid)
+            # Players who could see us get a TICK leave notification
+            self.interest.remove_player(pid)
+            self.enemy_acks.pop(pid, None)
+            self.tick_buffer.views_changed = True
+
+    # -----------------------------------------------------------
+    async def handle_message(self, websocket, pid, codec, msg):
+        """Dispatch one in-game packet from a logged-in client."""
+        mtype = msg.get("type", "")
+
+        # Movement
+        if mtype == "MOVE":
+            p = self.player_manager.players.get(pid)
+            if not p:
+                return
+            new_x, new_y = msg["x"], msg["y"]
+
+            # Basic movement validation (prevent teleporting)
+            dist = ((new_x - p.x) ** 2 + (new_y - p.y) ** 2) ** 0.5
+            if dist > MAX_MOVE_DISTANCE:
+                # Possible cheating or lag, send the current valid position back
+                await self.send(websocket, {
+                    "type": "CORRECT_POSITION",
+                    "x": p.x,
+                    "y": p.y
+                })
+                return
+
+            # Update position with slight tolerance for network jitter;
+            # other clients see it on the next tick flush
+            p.x, p.y = new_x, new_y
+            self.tick_buffer.add_move(pid, p.x, p.y)
+
+        # Basic attack
+        elif mtype == "ATTACK":
+            p = self.player_manager.players.get(pid)
+            if not p:
+                return
+            if self.shards:
+                result = await self.shards.attack(p)
+            else:
+                result = self.combat.player_attack(pid)
+            # Handle quest progress if slime was killed
+            if result.get("notify_type") == "SLIME_KILL":
+                q = self.quest_state.increment(pid, "slime")
+                if q:
+                    await self.send(websocket, json.dumps({"type": "QUEST_UPDATE", "quest": q}))
+                    if self.quest_state.check_complete(pid):
+                        # award XP
+                        if p:
+                            p.add_xp(q["reward_xp"])
+                            await self.send(websocket, json.dumps({"type": "QUEST_COMPLETE", "xp": q["reward_xp"], "p_data": p.serialize()}))
+
+            self.tick_buffer.add_event({
+                "type": "COMBAT",
+                "attacker": pid,
+                "p_data": p.serialize(),
+                "result": result
+            }, pos=(p.x, p.y))
+
+        # Skills (auto by class if 'skill' missing)
+        elif mtype == "SKILL":
+            p = self.player_manager.players.get(pid)
+            if not p:
+                return
+            skill_name = msg.get("skill")  # can be None -> auto by class
+            if self.shards:
+                result = await self.shards.skill(p, skill_name)
+            else:
+                result = self.skills.use_skill(pid, skill_name)
+            self.tick_buffer.add_move(pid, p.x, p.y)  # ShadowStep can relocate the caster
+            self.tick_buffer.add_event({
+                "type": "SKILL_FX",
+                "attacker": pid,
+                "skill": result.get("skill", skill_name),
+                "result": result,
+                "p_data": p.serialize()
+            }, pos=(p.x, p.y))
+
+        # Chat
+        elif mtype == "CHAT":
+            text = msg.get("text", "")
+            packet = {"type": "CHAT", "id": pid, "text": text}
+            self.tick_buffer.add_event(packet)
+
+
+        # Client confirms the enemy delta it has applied
+        elif mtype == "ACK":
+            seq = int(msg.get("seq", 0))
+            if self.enemy_acks.get(pid, 0) < seq <= self.enemy_manager.seq:
+                self.enemy_acks[pid] = seq
+
+        # Dialogue requests when player is near NPC
+        elif mtype == "TALK_NPC":
+            player = self.player_manager.players.get(pid)
+            if player:
+                npc_id, npc_data = self.npc_manager.nearby(player.x, player.y)
+                if npc_id:
+                    # For simplicity send the entire dialogue block for now
+                    await self.send(websocket, json.dumps({
+                        "type": "DIALOGUE",
+                        "npc_id": npc_id,
+                        "npc_name": npc_data["name"],
+                        "dialogue_id": npc_data.get("dialogue")
+                    }))
 
     # -----------------------------------------------------------
+    async def send(self, ws, frame):
+        """Queue a frame or packet for one client (direct send before login)."""
+        outbox = self.outboxes.get(ws)
+        if outbox is not None:
+            outbox.put(frame)
+            return
+        if isinstance(frame, dict):
+            frame = protocol.encode(frame)
+        self.metrics.record_send(frame_bytes(frame))
+        await ws.send(frame)
+
     async def broadcast(self, msg, exclude=None):
-        """Send a JSON string to all connected clients."""
+        """Send a JSON string (or packet) to all connected clients, encoded once."""
         if not self.clients:
             return
-        tasks = []
-        for ws in list(self.clients.keys()):
+        frame = TextFrame.from_str(msg) if isinstance(msg, str) else TextFrame.from_packet(msg)
+        sent = 0
+        for ws, outbox in list(self.outboxes.items()):
             if ws != exclude:
-                tasks.append(asyncio.create_task(ws.send(msg)))
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+                outbox.put(frame)
+                sent += 1
+        self.metrics.record_fanout(sent)
+
+    # -----------------------------------------------------------
+    # Simulation tick
+    # -----------------------------------------------------------
+    async def tick_loop(self):
+        """Fixed-rate server tick; flushes batched world changes."""
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / SERVER_TICK_RATE
+        next_tick = loop.time()
+        while True:
+            next_tick += interval
+            start = time.perf_counter()
+            try:
+                await self.flush_tick()
+            except Exception as e:
+                print(f"[Server Error in tick] Unexpected error: {e}")
+                import traceback
+                traceback.print_exc()
+            self.metrics.record_tick(time.perf_counter() - start)
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Fell behind: drop the missed ticks instead of bursting
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def flush_tick(self):
+        """Send one coalesced TICK packet per client, filtered to its area of interest."""
+        self.tick_count += 1
+        if self.enemy_ai:
+            self.apply_enemy_hits(self.enemy_ai.step(self.player_manager.players))
+        respawned = self.enemy_manager.respawns.step()
+        if respawned:
+            self.metrics.count("enemy_respawns", respawned)
+        enemy_seq = self.enemy_manager.commit_delta()
+        behind = any(ack < enemy_seq for ack in self.enemy_acks.values())
+        if self.tick_buffer.is_empty() and not behind:
+            return
+        moves, events = self.tick_buffer.drain()
+        for mid, (x, y) in moves.items():
+            self.interest.move_player(mid, x, y)
+        if self.shards:
+            self.shards.sync_moves(moves)
+        if not self.clients:
+            return
+        players = self.player_manager.players
+        enemies = self.enemy_manager.get_state()
+        deltas = {}                       # ack seq -> merged enemy delta, shared by clients
+        # Every move, event and enemy record is serialized once per tick, and
+        # clients with identical views get the same frames
+        encoder = TickEncoder(self.tick_count, moves, events, players, enemies)
+
+        sent = 0
+        for ws, pid in list(self.clients.items()):
+            outbox = self.outboxes.get(ws)
+            players_in, players_out, enemies_in, enemies_out = self.interest.update_view(pid, self.enemy_manager.index)
+            view = self.interest.views.get(pid)
+            if view is None or outbox is None:
+                continue
+
+            # Newly visible players arrive with a full record, so skip their move
+            move_ids = tuple(mid for mid in moves if mid in view["players"] and mid not in players_in)
+            event_ids = tuple(i for i, (ev, pos) in enumerate(events)
+                              if pos is None or self.interest.in_view(pid, *pos))
+            ack = self.enemy_acks.get(pid, enemy_seq)
+            section = self.enemy_section(pid, view, enemies, enemies_in, enemies_out, enemy_seq, deltas)
+
+            encoded = encoder.encode(outbox.codec, move_ids, event_ids, players_in, players_out, section, ack)
+            if encoded.frames and outbox.put(encoded):
+                sent += 1
+        self.metrics.record_fanout(sent)
+        self.metrics.count("fanout_encoded", encoder.built)
+        self.metrics.count("fanout_shared", encoder.shared)
+
+    def apply_enemy_hits(self, hits):
+        """Damage players hit by enemies this tick; the fallen respawn in the castle."""
+        players = self.player_manager.players
+        for eid, pid, attack in hits:
+            p = players.get(pid)
+            if p is None:
+                continue
+            pos = (p.x, p.y)
+            dmg = max(1, attack - p.stats.get("def", 0))
+            p.stats["hp"] -= dmg
+            killed = p.stats["hp"] <= 0
+            if killed:
+                p.respawn()
+                self.tick_buffer.add_move(pid, p.x, p.y)
+            self.tick_buffer.add_event({
+                "type": "ENEMY_ATTACK",
+                "enemy_id": eid,
+                "target": pid,
+                "damage": dmg,
+                "killed": killed,
+                "p_data": p.serialize()
+            }, pos=pos)
+        if hits:
+            self.metrics.count("enemy_hits", len(hits))
+
+    def enemy_section(self, pid, view, enemies, enemies_in, enemies_out, enemy_seq, deltas):
+        """Build the enemy part of a TICK: only fields changed since the client's ack."""
+        ack = self.enemy_acks.get(pid, enemy_seq)
+        if ack not in deltas:
+            deltas[ack] = self.enemy_manager.delta_since(ack)
+        delta = deltas[ack]
+        if delta is None:
+            # Too far behind the kept history: resend everything in view
+            return {"seq": enemy_seq, "reset": True,
+                    "spawn": {eid: enemies[eid] for eid in view["enemies"]}}
+
+        section = {}
+        # Entering the view counts as a spawn and leaving it as a despawn
+        if enemies_in:
+            section["spawn"] = {eid: enemies[eid] for eid in enemies_in}
+        updates = {eid: fields for eid, fields in delta["update"].items()
+                   if eid in view["enemies"] and eid not in enemies_in}
+        if updates:
+            section["update"] = updates
+        if enemies_out:
+            section["despawn"] = list(enemies_out)
+        if not section:
+            # Nothing this client can see changed, so it is already up to date
+            self.enemy_acks[pid] = enemy_seq
+            return None
+        section["seq"] = enemy_seq
+        return section
 
     # -----------------------------------------------------------
     async def run(self):
-        print(f"[Server] Starting on ws://{HOST}:{PORT}")
-        async with websockets.serve(self.handler, HOST, PORT):
-            await asyncio.Future()  # run forever
+        print(f"[Server] Starting on ws://{HOST}:{PORT} ({SERVER_TICK_RATE} ticks/s)")
+        db.enable_wal()
+        try:
+            if self.shards:
+                self.shards.start()
+            async with websockets.serve(self.handler, HOST, PORT):
+                tick_task = asyncio.create_task(self.tick_loop())
+                persist_task = asyncio.create_task(persistence.run())
+                background = [asyncio.create_task(self.metrics.monitor_loop_lag())]
+                if METRICS_DUMP_INTERVAL > 0:
+                    background.append(asyncio.create_task(self.metrics.run_dump()))
+                try:
+                    await asyncio.Future()  # run forever
+                finally:
+                    tick_task.cancel()
+                    persist_task.cancel()
+                    for task in background:
+                        task.cancel()
+                    persistence.flush()  # crash-safe final write of anything still queued
+        finally:
+            # Also runs if serve() fails to bind: never leave workers behind
+            if self.shards:
+                self.shards.close()
 
 
 # -----------------------------------------------------------
@@ -0,0 +1,180 @@
+# ===============================================================
+# Isekai Online - Server Metrics
+# ===============================================================
+# Cheap in-process counters and fixed-bucket histograms for the game
+# server: per-message-type counts and handler latency, tick duration,
+# fan-out size, bytes in/out and event-loop lag. A snapshot is written
+# to a JSON file periodically so the server can be watched under load.
+
+import asyncio
+import json
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+
+# Config constants
+METRICS_DUMP_INTERVAL = cfg.METRICS_DUMP_INTERVAL
+METRICS_LAG_INTERVAL = cfg.METRICS_LAG_INTERVAL
+
+DUMP_FILE = Path(__file__).resolve().parent / "metrics.json"
+
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+FANOUT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def frame_bytes(frame) -> int:
+    """Wire size of a websocket frame; text frames count UTF-8 bytes, not characters."""
+    if isinstance(frame, str):
+        return len(frame) if frame.isascii() else len(frame.encode("utf-8"))
+    return len(frame)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and an increment."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th sample."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}" for b in self.bounds] + ["+inf"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class ServerMetrics:
+    """Instrumentation surface shared by the server's hot paths."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.messages: Dict[str, int] = {}
+        self.handler_ms: Dict[str, Histogram] = {}
+        self.tick_ms = Histogram()
+        self.loop_lag_ms = Histogram()
+        self.fanout = Histogram(FANOUT_BUCKETS)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames_in = 0
+        self.frames_out = 0
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, Callable[[], object]] = {}
+
+    # -----------------------------------------------------------
+    # Recording
+    # -----------------------------------------------------------
+    def record_message(self, mtype: str, nbytes: int, seconds: float):
+        """One client packet handled: its type, size and handler time."""
+        self.messages[mtype] = self.messages.get(mtype, 0) + 1
+        hist = self.handler_ms.get(mtype)
+        if hist is None:
+            hist = self.handler_ms[mtype] = Histogram()
+        hist.observe(seconds * 1000)
+        self.frames_in += 1
+        self.bytes_in += nbytes
+
+    def record_send(self, nbytes: int):
+        self.frames_out += 1
+        self.bytes_out += nbytes
+
+    def record_fanout(self, recipients: int):
+        """Clients reached by one tick flush or broadcast."""
+        self.fanout.observe(recipients)
+
+    def record_tick(self, seconds: float):
+        self.tick_ms.observe(seconds * 1000)
+
+    def count(self, name: str, n: int = 1):
+        """Bump a named event counter (evictions, coalesced packets...)."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, fn: Callable[[], object]):
+        """Register a value read at snapshot time (queue depth, client count...)."""
+        self.gauges[name] = fn
+
+    # -----------------------------------------------------------
+    # Reporting
+    # -----------------------------------------------------------
+    def snapshot(self) -> dict:
+        uptime = max(time.time() - self.started, 1e-9)
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "uptime_s": round(uptime, 1),
+            "messages": dict(self.messages),
+            "messages_per_s": round(sum(self.messages.values()) / uptime, 2),
+            "handler_ms": {t: h.snapshot() for t, h in self.handler_ms.items()},
+            "tick_ms": self.tick_ms.snapshot(),
+            "loop_lag_ms": self.loop_lag_ms.snapshot(),
+            "fanout": self.fanout.snapshot(),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "bytes_out_per_s": round(self.bytes_out / uptime, 1),
+            "counters": dict(self.counters),
+            "gauges": {name: fn() for name, fn in self.gauges.items()},
+        }
+
+    def dump(self, path=DUMP_FILE):
+        """Write a snapshot atomically so readers never see a partial file."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    # -----------------------------------------------------------
+    # Background tasks
+    # -----------------------------------------------------------
+    async def monitor_loop_lag(self, interval: float = METRICS_LAG_INTERVAL):
+        """Measure how late the event loop wakes us up: a direct stall signal."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag_ms.observe(max(0.0, loop.time() - start - interval) * 1000)
+
+    async def run_dump(self, path=DUMP_FILE, interval: float = METRICS_DUMP_INTERVAL):
+        """Dump a snapshot every interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.dump(path)
+            except OSError as e:
+                print(f"[Metrics] Could not write {path}: {e}")
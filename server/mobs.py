@@ -12,11 +12,7 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 import config as cfg
-from server.world import (
-    is_safe_spawn,
-    random_spawn_area,
-    in_city,
-)
+from server.world import random_spawn_area
 
 # Config constants
 INITIAL_MOB_COUNT = cfg.INITIAL_MOB_COUNT
@@ -34,23 +30,22 @@ class MobManager:
 
     def spawn_mob(self, mob_type="slime"):
         """Spawn a single mob safely outside the city."""
+        pos = random_spawn_area()  # open ground outside the castle
+        if pos is None:
+            return None
         mid = str(uuid.uuid4())[:4]
-        for _ in range(120):
-            mx, my = random_spawn_area()
-            # must be safe terrain and NOT inside the castle
-            if is_safe_spawn(mx, my) and not in_city(mx, my):
-                lvl = random.randint(MOB_MIN_LEVEL, MOB_MAX_LEVEL)
-                max_hp = MOB_BASE_HP + lvl * MOB_HP_PER_LEVEL
-                self.mobs[mid] = {
-                    "type": mob_type,
-                    "x": mx,
-                    "y": my,
-                    "hp": max_hp,
-                    "max_hp": max_hp,
-                    "lvl": lvl,
-                }
-                return mid
-        return None
+        mx, my = pos
+        lvl = random.randint(MOB_MIN_LEVEL, MOB_MAX_LEVEL)
+        max_hp = MOB_BASE_HP + lvl * MOB_HP_PER_LEVEL
+        self.mobs[mid] = {
+            "type": mob_type,
+            "x": mx,
+            "y": my,
+            "hp": max_hp,
+            "max_hp": max_hp,
+            "lvl": lvl,
+        }
+        return mid
 
     def spawn_initial_mobs(self, count=INITIAL_MOB_COUNT):
         """Spawn multiple mobs at startup."""
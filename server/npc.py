@@ -4,6 +4,7 @@
 from typing import Dict
 from shared.story import START_DIALOGUE
 from server.world import in_city
+from server.enemies import SpatialHash
 
 
 class NPCManager:
@@ -17,13 +18,15 @@ class NPCManager:
                 "dialogue": START_DIALOGUE.id,
             }
         }
+        self.index = SpatialHash()
+        for nid, n in self.npcs.items():
+            self.index.insert(nid, n["x"], n["y"])
 
     def get_state(self):
         return self.npcs
 
     def nearby(self, x: float, y: float, radius: float = 80):
-        for nid, n in self.npcs.items():
-            dx, dy = n["x"] - x, n["y"] - y
-            if (dx * dx + dy * dy) ** 0.5 <= radius:
-                return nid, n
-        return None, None
+        nid = self.index.nearest(x, y, radius)
+        if nid is None:
+            return None, None
+        return nid, self.npcs[nid]
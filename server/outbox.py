@@ -0,0 +1,150 @@
+# ===============================================================
+# Isekai Online - Per-Client Send Queue
+# ===============================================================
+# Every connection owns one bounded outbound queue drained by a single
+# writer task, so a slow client only ever delays itself. Position-only
+# packets that are still waiting get merged with newer ones instead of
+# piling up, and a client whose queue overflows anyway is disconnected.
+
+import asyncio
+import inspect
+from collections import deque
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+from websockets.exceptions import ConnectionClosed
+
+import config as cfg
+from shared import protocol
+from server.fanout import Encoded, TextFrame
+from server.metrics import frame_bytes
+
+# Config constants
+SEND_QUEUE_LIMIT = cfg.SEND_QUEUE_LIMIT
+
+# A TICK made of only these keys carries nothing but player positions
+_MOVE_ONLY_KEYS = {"type", "tick", "moves"}
+
+
+def _packet(item):
+    return item.packet if isinstance(item, Encoded) else item
+
+
+def supersedable(item) -> bool:
+    """True for packets a newer packet of the same kind fully replaces."""
+    packet = _packet(item)
+    if not isinstance(packet, dict):
+        return False
+    if packet.get("type") == "TICK":
+        return packet.keys() <= _MOVE_ONLY_KEYS
+    return packet.get("type") == "CORRECT_POSITION"
+
+
+class ClientOutbox:
+    """Bounded FIFO of outgoing packets for one websocket.
+
+    Items are packet dicts (encoded with the client's codec when sent),
+    single encoded frames (str / bytes / TextFrame) or Encoded fan-out
+    results whose frames are shared with other clients.
+    """
+
+    def __init__(self, ws, codec=protocol.CODEC_JSON, metrics=None, limit: int = SEND_QUEUE_LIMIT):
+        self.ws = ws
+        self.codec = codec
+        self.metrics = metrics
+        self.limit = limit
+        self.queue = deque()
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._writer = None
+        # Pre-encoded JSON can go out as a text frame without re-encoding
+        try:
+            self._send_text = "text" in inspect.signature(ws.send).parameters
+        except (TypeError, ValueError):
+            self._send_text = False
+
+    def start(self):
+        self._writer = asyncio.create_task(self._drain())
+        return self
+
+    # -----------------------------------------------------------
+    def put(self, item) -> bool:
+        """Queue a packet or frame; False if the client was evicted."""
+        if self.closed:
+            return False
+        if supersedable(item) and self.queue and supersedable(self.queue[-1]):
+            tail = _packet(self.queue[-1])
+            if tail["type"] == _packet(item)["type"]:
+                self.queue[-1] = self._merge(tail, _packet(item))
+                if self.metrics:
+                    self.metrics.count("send_coalesced")
+                return True
+        if len(self.queue) >= self.limit:
+            self.evict()
+            return False
+        self.queue.append(item)
+        self._ready.set()
+        return True
+
+    @staticmethod
+    def _merge(tail, item):
+        """A new packet equal to the queued one followed by the newer one."""
+        # Build a fresh dict: queued packets may be shared with other clients
+        if item["type"] == "TICK":
+            return {"type": "TICK", "tick": item["tick"],
+                    "moves": {**tail.get("moves", {}), **item.get("moves", {})}}
+        return item
+
+    def evict(self):
+        """Drop a client that cannot keep up with its own queue."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self.metrics:
+            self.metrics.count("send_evicted")
+        print(f"[Server] Evicting slow client (send queue over {self.limit})")
+        asyncio.create_task(self.ws.close(code=1013, reason="Send queue overflow"))
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        if self._writer:
+            self._writer.cancel()
+
+    @property
+    def depth(self) -> int:
+        return len(self.queue)
+
+    # -----------------------------------------------------------
+    async def _drain(self):
+        """Single writer: send queued items in order until the socket closes."""
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                item = self.queue.popleft()
+                if isinstance(item, Encoded):
+                    frames = item.frames
+                elif isinstance(item, dict):
+                    frames = protocol.encode_frames(item, self.codec)
+                else:
+                    frames = (item,)
+                for frame in frames:
+                    if self.metrics:
+                        self.metrics.record_send(frame_bytes(frame))
+                    if isinstance(frame, TextFrame):
+                        if self._send_text:
+                            await self.ws.send(frame, text=True)
+                        else:
+                            await self.ws.send(frame.decode("utf-8"))
+                    else:
+                        await self.ws.send(frame)
+        except ConnectionClosed:
+            self.closed = True
@@ -0,0 +1,132 @@
+# ===============================================================
+# Isekai Online - Write-Behind Player Persistence
+# ===============================================================
+# Gameplay code marks players dirty instead of writing to SQLite on
+# every XP gain. Dirty players are coalesced (one row per player no
+# matter how many changes) and flushed in a single transaction on an
+# interval, on shutdown, and at interpreter exit.
+
+import asyncio
+import atexit
+import time
+from typing import Dict
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+
+# Config constants
+PERSIST_FLUSH_INTERVAL = cfg.PERSIST_FLUSH_INTERVAL
+
+
+class PlayerPersistence:
+    """Coalescing write-behind queue in front of Database.save_players."""
+
+    def __init__(self, db, interval: float = PERSIST_FLUSH_INTERVAL):
+        self.db = db
+        self.interval = interval
+        self.dirty: Dict[str, object] = {}  # pid -> Player, serialized at flush time
+        self.inflight: Dict[str, dict] = {}  # pid -> data being written right now
+        # Instrumentation
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        atexit.register(self.flush)  # final flush if the process exits normally
+
+    # -----------------------------------------------------------
+    def mark_dirty(self, player):
+        """Queue a player for the next flush; repeated marks coalesce."""
+        self.dirty[player.id] = player
+
+    def pending(self, pid: str):
+        """Unflushed data for a player, so a quick re-login never reads stale rows."""
+        player = self.dirty.get(pid)
+        if player is not None:
+            return player.serialize()
+        return self.inflight.get(pid)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.dirty)
+
+    # -----------------------------------------------------------
+    def _take_batch(self):
+        batch, self.dirty = self.dirty, {}
+        return [(pid, p.serialize()) for pid, p in batch.items()], batch
+
+    def _requeue(self, batch, e):
+        # Put the batch back without clobbering anything marked since
+        self.failures += 1
+        for pid, p in batch.items():
+            self.dirty.setdefault(pid, p)
+        print(f"[Persistence] Flush failed, {len(batch)} players re-queued: {e}")
+
+    def _record(self, rows: int, start: float):
+        elapsed = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.rows_written += rows
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+
+    def flush(self) -> int:
+        """Write every dirty player in one transaction; returns rows written."""
+        if not self.dirty:
+            return 0
+        rows, batch = self._take_batch()
+        start = time.perf_counter()
+        try:
+            self.db.save_players(rows)
+        except Exception as e:
+            self._requeue(batch, e)
+            return 0
+        self._record(len(rows), start)
+        return len(rows)
+
+    async def flush_async(self) -> int:
+        """flush() with the write on the DB thread instead of the event loop."""
+        if not self.dirty:
+            return 0
+        rows, batch = self._take_batch()
+        self.inflight.update(rows)
+        start = time.perf_counter()
+        try:
+            await self.db.save_players_async(rows)
+        except asyncio.CancelledError:
+            # Shutdown: the write may never run, so hand the batch to
+            # run()'s final flush (an upsert, harmless if it did run)
+            for pid, p in batch.items():
+                self.dirty.setdefault(pid, p)
+            raise
+        except Exception as e:
+            self._requeue(batch, e)
+            return 0
+        finally:
+            for pid, _ in rows:
+                self.inflight.pop(pid, None)
+        self._record(len(rows), start)
+        return len(rows)
+
+    async def run(self):
+        """Flush on a fixed interval until cancelled, then flush once more."""
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.flush_async()
+        finally:
+            self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
@@ -13,19 +13,21 @@ if root_dir not in sys.path:
 import config as cfg
 from server.world import city_spawn_point
 from server.database import Database
+from server.persistence import PlayerPersistence
 
 # Config constants
 DEFAULT_STATS = cfg.DEFAULT_STATS
 XP_PER_LEVEL = cfg.XP_PER_LEVEL
 
-# shared db connection
+# shared db connection + write-behind save queue
 db = Database()
+persistence = PlayerPersistence(db)
 
 
 class Player:
     """Represents a single player entity."""
 
-    def __init__(self, class_name="warrior", player_id=None):
+    def __init__(self, class_name="warrior", player_id=None, saved=None):
         self.id = player_id or str(uuid.uuid4())[:4]
         self.class_name = class_name
         self.x, self.y = self.spawn()  # spawn in castle
@@ -35,8 +37,10 @@ class Player:
         self.level = 1
         self.xp = 0
 
-        # attempt to load saved data
-        saved = db.load_player(self.id)
+        # attempt to load saved data (unflushed changes win over the DB row);
+        # callers that already fetched it pass saved ({} when there is none)
+        if saved is None:
+            saved = persistence.pending(self.id) or db.load_player(self.id)
         if saved:
             self.class_name = saved.get("class", self.class_name)
             self.level = saved.get("lvl", self.level)
@@ -63,7 +67,7 @@ class Player:
             leveled_up = True
             self.stats["max_hp"] = self.stats.get("max_hp", 100) + 20
             self.stats["hp"] = self.stats["max_hp"]
-        db.save_player(self.id, self.serialize())
+        persistence.mark_dirty(self)
         return leveled_up
 
     def serialize(self):
@@ -93,11 +97,19 @@ class PlayerManager:
         self.players[player.id] = player
         return player
 
+    async def create_player_async(self, class_name="warrior", existing_id=None) -> Player:
+        """create_player with the saved-row lookup done on the DB thread."""
+        saved = {}
+        if existing_id:
+            saved = persistence.pending(existing_id) or await db.load_player_async(existing_id) or {}
+        player = Player(class_name, existing_id, saved)
+        self.players[player.id] = player
+        return player
+
     def remove_player(self, pid: str):
-        """Remove player from memory and persist to DB."""
+        """Remove player from memory and queue its final save."""
         if pid in self.players:
-            db.save_player(pid, self.players[pid].serialize())
-            del self.players[pid]
+            persistence.mark_dirty(self.players.pop(pid))
 
     def get_player(self, pid: str):
         """Fetch a player object."""
@@ -108,9 +120,10 @@ class PlayerManager:
         return {pid: p.serialize() for pid, p in self.players.items()}
 
     def save_all(self):
-        """Save all loaded players to DB."""
+        """Save all loaded players to DB in one transaction."""
         for p in self.players.values():
-            db.save_player(p.id, p.serialize())
+            persistence.mark_dirty(p)
+        persistence.flush()
 
 
 if __name__ == "__main__":
@@ -24,6 +24,7 @@ class QuestState:
             "name": q.name,
             "description": q.description,
             "objective": q.objective,
+            "progress_key": q.progress_key,
             "required": q.required,
             "progress": 0,
             "reward_xp": q.reward_xp,
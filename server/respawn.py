@@ -0,0 +1,75 @@
+# ===============================================================
+# Isekai Online - Enemy Respawn Scheduler
+# ===============================================================
+# Killing an enemy only queues its replacement: a heap keyed by due
+# time holds one entry per death, and the server tick spawns whatever
+# is due, a bounded batch at a time. Spawning never runs inside an
+# attack or skill handler, and an AoE that clears a whole pack is
+# refilled over a few ticks instead of in one spike. Each zone has a
+# population target, so replacements never push a zone past it.
+
+import heapq
+import itertools
+import time
+from typing import Dict, List, Tuple
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+
+# Config constants
+ENEMY_RESPAWN_DELAY = cfg.ENEMY_RESPAWN_DELAY
+ENEMY_RESPAWN_BATCH = cfg.ENEMY_RESPAWN_BATCH
+
+
+class RespawnScheduler:
+    """Delayed, batched, per-zone enemy respawns over an EnemyManager."""
+
+    def __init__(self, enemy_manager, delay: float = ENEMY_RESPAWN_DELAY,
+                 batch: int = ENEMY_RESPAWN_BATCH, clock=time.monotonic):
+        self.enemies = enemy_manager
+        self.delay = delay
+        self.batch = batch
+        self.clock = clock
+        self.targets: Dict[str, int] = {}       # zone name -> population to keep
+        self.heap: List[Tuple[float, int, str]] = []  # (due time, order, zone name)
+        self._order = itertools.count()
+        self.respawned = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, zone_name: str, delay: float = None):
+        """Queue one replacement enemy for a zone."""
+        if zone_name is None:
+            return  # not spawned from a zone (e.g. a shard replica)
+        due = self.clock() + (self.delay if delay is None else delay)
+        heapq.heappush(self.heap, (due, next(self._order), zone_name))
+
+    def step(self) -> int:
+        """Spawn due replacements, at most batch of them; returns how many."""
+        heap = self.heap
+        if not heap:
+            return 0
+        now = self.clock()
+        if heap[0][0] > now:
+            return 0
+        zones = {z.name: z for z in self.enemies.zones}
+        population = self.enemies.population
+        spawned = 0
+        while heap and heap[0][0] <= now and spawned < self.batch:
+            _, _, name = heapq.heappop(heap)
+            zone = zones.get(name)
+            if zone is None:
+                continue
+            target = self.targets.get(name)
+            if target is not None and population.get(name, 0) >= target:
+                continue  # already refilled
+            if self.enemies.spawn_enemy(zone) is not None:
+                spawned += 1
+        self.respawned += spawned
+        return spawned
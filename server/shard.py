@@ -0,0 +1,403 @@
+# ===============================================================
+# Isekai Online - Zone Sharding (gateway + zone worker processes)
+# ===============================================================
+# With ZONE_SHARDING on, every group of spawn zones is simulated by its
+# own worker process: the worker owns the enemies of its zones and runs
+# combat and skills against them. The main server becomes the gateway:
+# it keeps the websockets, accounts, players and persistence, mirrors
+# enemy state from the per-tick change sets the workers send back, and
+# hands a player to another worker when they walk across a zone
+# boundary. Players are authoritative on the gateway; each request
+# carries a fresh snapshot so workers never drift, and each reply
+# carries only what the request changed, applied on top of whatever
+# happened to the player on the gateway in the meantime.
+
+import asyncio
+import itertools
+import multiprocessing
+import threading
+import time
+from typing import Dict, List
+import sys
+import os
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_dir not in sys.path:
+    sys.path.append(root_dir)
+
+import config as cfg
+from server import player as player_module
+from server.player import PlayerManager, persistence
+from server.enemies import EnemyManager
+from server.combat_enhanced import EnhancedCombatSystem
+from server.skills import SkillManager
+from server.enemy_ai import EnemyAI
+
+# Config constants
+SERVER_TICK_RATE = cfg.SERVER_TICK_RATE
+ZONE_SHARD_GROUPS = cfg.ZONE_SHARD_GROUPS
+INITIAL_ENEMY_COUNT = cfg.INITIAL_ENEMY_COUNT
+ENEMY_AI = cfg.ENEMY_AI
+XP_PER_LEVEL = cfg.XP_PER_LEVEL
+
+ZONE_UNAVAILABLE = {"result": "fail", "reason": "Zone unavailable."}
+
+
+def apply_snapshot(player, snap: dict):
+    """Copy a serialized player record onto a Player object."""
+    player.x, player.y = snap["x"], snap["y"]
+    player.class_name = snap["class"]
+    player.level = snap["lvl"]
+    player.xp = snap["xp"]
+    player.stats["hp"] = snap["hp"]
+    player.stats["max_hp"] = snap["max_hp"]
+
+
+def player_changes(before: dict, after: dict) -> dict:
+    """What one request did to a mirror player, as relative changes.
+
+    xp: total experience gained (the gateway re-runs leveling)
+    heal: hp restored outside of a level-up (HealLight)
+    move: (dx, dy) the player was displaced by (ShadowStep)
+    """
+    changes = {}
+    xp = (after["lvl"] - before["lvl"]) * XP_PER_LEVEL + after["xp"] - before["xp"]
+    if xp:
+        changes["xp"] = xp
+    elif after["hp"] != before["hp"]:
+        changes["heal"] = after["hp"] - before["hp"]
+    if (after["x"], after["y"]) != (before["x"], before["y"]):
+        changes["move"] = (after["x"] - before["x"], after["y"] - before["y"])
+    return changes
+
+
+def apply_changes(player, changes: dict):
+    """Apply a worker's relative changes to the gateway's current player."""
+    if "xp" in changes:
+        player.add_xp(changes["xp"])
+    if "heal" in changes:
+        stats = player.stats
+        stats["hp"] = max(0, min(stats["max_hp"], stats["hp"] + changes["heal"]))
+        persistence.mark_dirty(player)
+    if "move" in changes:
+        dx, dy = changes["move"]
+        player.x, player.y = player.x + dx, player.y + dy
+
+
+class ZoneMap:
+    """Which shard owns a world position, by SpawnZone rectangles.
+
+    Zones are matched in EnemyManager order (the castle before the
+    grasslands around it); points outside every zone belong to the
+    nearest one.
+    """
+
+    def __init__(self, zones, groups: List[List[str]] = ZONE_SHARD_GROUPS):
+        names = {z.name for z in zones}
+        self.shard_of: Dict[str, int] = {}
+        for shard_id, group in enumerate(groups):
+            for name in group:
+                if name not in names:
+                    raise ValueError(f"ZONE_SHARD_GROUPS names unknown zone {name!r}")
+                self.shard_of[name] = shard_id
+        for name in names - self.shard_of.keys():
+            self.shard_of[name] = 0  # unlisted zones ride with the first worker
+        self.zones = zones
+
+    def zone_at(self, x: float, y: float):
+        for zone in self.zones:
+            if zone.x_min <= x <= zone.x_max and zone.y_min <= y <= zone.y_max:
+                return zone
+
+        def gap(zone):
+            dx = max(zone.x_min - x, 0, x - zone.x_max)
+            dy = max(zone.y_min - y, 0, y - zone.y_max)
+            return dx * dx + dy * dy
+        return min(self.zones, key=gap)
+
+    def owner(self, x: float, y: float) -> int:
+        return self.shard_of[self.zone_at(x, y).name]
+
+
+# -----------------------------------------------------------
+# Worker process
+# -----------------------------------------------------------
+class _NoPersistence:
+    """Workers hold mirror players only; saving is the gateway's job."""
+
+    def mark_dirty(self, player):
+        pass
+
+    def pending(self, pid):
+        return None
+
+
+class ZoneWorker:
+    """Simulates one group of zones; driven by messages from the gateway."""
+
+    def __init__(self, shard_id: int, zone_names: List[str], conn):
+        player_module.persistence = _NoPersistence()
+        self.shard_id = shard_id
+        self.conn = conn
+        self.enemies = EnemyManager(id_prefix=f"z{shard_id}_")
+        populated = len([z for z in self.enemies.zones if z.enemy_types])
+        self.enemies.zones = [z for z in self.enemies.zones if z.name in zone_names]
+        own = len([z for z in self.enemies.zones if z.enemy_types])
+        self.initial = round(INITIAL_ENEMY_COUNT * own / populated)
+        self.players = PlayerManager()
+        self.combat = EnhancedCombatSystem(self.players, self.enemies)
+        self.skills = SkillManager(self.players, self.enemies)
+        self.ai = EnemyAI(self.enemies) if ENEMY_AI else None
+
+    # -----------------------------------------------------------
+    def mirror(self, pid: str, snap: dict):
+        """Create or refresh the local copy of a gateway player."""
+        player = self.players.players.get(pid)
+        if player is None:
+            player = self.players.players[pid] = player_module.Player(snap["class"], pid, saved=snap)
+        apply_snapshot(player, snap)
+        return player
+
+    def handle(self, msg):
+        kind = msg[0]
+        if kind == "moves":
+            for pid, (x, y) in msg[1].items():
+                player = self.players.players.get(pid)
+                if player:
+                    player.x, player.y = x, y
+        elif kind == "attack":
+            _, rid, pid, snap = msg
+            player = self.mirror(pid, snap)
+            result = self.combat.player_attack(pid)
+            self.conn.send(("result", rid, result, player_changes(snap, player.serialize())))
+        elif kind == "skill":
+            _, rid, pid, snap, skill_name = msg
+            player = self.mirror(pid, snap)
+            result = self.skills.use_skill(pid, skill_name)
+            self.conn.send(("result", rid, result, player_changes(snap, player.serialize())))
+        elif kind == "enter":
+            self.mirror(msg[1], msg[2])
+        elif kind == "leave":
+            self.players.players.pop(msg[1], None)
+            self.skills.forget(msg[1])
+
+    def tick(self):
+        """Run enemy AI, then ship this tick's enemy changes and hits to the gateway."""
+        if self.ai:
+            hits = self.ai.step(self.players.players)
+            if hits:
+                self.conn.send(("hits", hits))
+        self.enemies.respawns.step()
+        seq = self.enemies.seq
+        if self.enemies.commit_delta() != seq:
+            self.conn.send(("delta",) + self.enemies.last_delta())
+
+    def run(self):
+        self.enemies.spawn_initial_enemies(self.initial)
+        self.tick()
+        interval = 1.0 / SERVER_TICK_RATE
+        next_tick = time.perf_counter() + interval
+        while True:
+            timeout = next_tick - time.perf_counter()
+            if timeout > 0 and self.conn.poll(timeout):
+                msg = self.conn.recv()
+                if msg[0] == "stop":
+                    return
+                self.handle(msg)
+                continue
+            self.tick()
+            next_tick += interval
+            if next_tick < time.perf_counter():
+                next_tick = time.perf_counter() + interval  # fell behind: skip, don't burst
+
+
+def run_zone_worker(shard_id: int, zone_names: List[str], conn):
+    """Process entry point for one zone shard."""
+    try:
+        ZoneWorker(shard_id, zone_names, conn).run()
+    except (EOFError, KeyboardInterrupt):
+        pass  # gateway went away
+    finally:
+        conn.close()
+
+
+# -----------------------------------------------------------
+# Gateway side
+# -----------------------------------------------------------
+class ZoneShard:
+    """Gateway handle for one worker process."""
+
+    def __init__(self, shard_id: int, zone_names: List[str]):
+        self.id = shard_id
+        self.zone_names = zone_names
+        self.conn = None
+        self.process = None
+        self.reader = None     # thread forwarding this worker's messages
+        self.alive = False
+        self.players = set()   # player ids this worker currently simulates
+        self.moves = {}        # pid -> (x, y) batched until the next tick
+
+    def send(self, msg) -> bool:
+        if not self.alive:
+            return False
+        try:
+            self.conn.send(msg)
+            return True
+        except (OSError, EOFError):
+            self.alive = False
+            return False
+
+
+class ZoneShards:
+    """Routes players and combat to zone workers and mirrors their enemies."""
+
+    def __init__(self, player_manager, enemy_manager, metrics=None, groups=ZONE_SHARD_GROUPS, on_hits=None):
+        self.player_manager = player_manager
+        self.enemy_manager = enemy_manager    # read-only replica fed by worker deltas
+        self.metrics = metrics
+        self.on_hits = on_hits                # applies worker enemy hits to gateway players
+        self.map = ZoneMap(enemy_manager.zones, groups)
+        self.shards = [ZoneShard(i, list(group)) for i, group in enumerate(groups)]
+        self.location: Dict[str, int] = {}    # pid -> shard id
+        self.pending: Dict[int, tuple] = {}   # request id -> (shard id, future)
+        self._ids = itertools.count(1)
+        self._loop = None
+
+    def start(self):
+        """Launch the workers; call from the gateway's running event loop."""
+        self._loop = asyncio.get_running_loop()
+        # spawn, not fork: the gateway already runs DB and bcrypt threads
+        ctx = multiprocessing.get_context("spawn")
+        for shard in self.shards:
+            shard.conn, child = ctx.Pipe()
+            shard.process = ctx.Process(target=run_zone_worker, args=(shard.id, shard.zone_names, child),
+                                        name=f"zone-{shard.id}", daemon=True)
+            shard.process.start()
+            child.close()
+            shard.alive = True
+            shard.reader = threading.Thread(target=self._read, args=(shard,), daemon=True)
+            shard.reader.start()
+            print(f"[Server] Zone shard {shard.id} ({', '.join(shard.zone_names)}) pid {shard.process.pid}")
+
+    def close(self):
+        for shard in self.shards:
+            shard.send(("stop",))
+            shard.alive = False
+        for shard in self.shards:
+            if shard.process is not None:
+                shard.process.join(timeout=2)
+                if shard.process.is_alive():
+                    shard.process.terminate()
+            # The worker is gone, so its reader hits EOF and exits
+            if shard.reader is not None:
+                shard.reader.join(timeout=2)
+
+    # -----------------------------------------------------------
+    # Worker -> gateway
+    # -----------------------------------------------------------
+    def _read(self, shard: ZoneShard):
+        """Reader thread: forward every worker message to the event loop."""
+        try:
+            while True:
+                msg = shard.conn.recv()
+                self._loop.call_soon_threadsafe(self._dispatch, msg)
+        except (EOFError, OSError):
+            pass
+        try:
+            self._loop.call_soon_threadsafe(self._lost, shard)
+        except RuntimeError:
+            pass  # event loop already closed: the gateway is shutting down
+
+    def _dispatch(self, msg):
+        kind = msg[0]
+        if kind == "delta":
+            self.enemy_manager.apply_delta(*msg[1:])
+        elif kind == "hits":
+            if self.on_hits:
+                self.on_hits(msg[1])
+        elif kind == "result":
+            _, future = self.pending.pop(msg[1], (None, None))
+            if future is not None and not future.done():
+                future.set_result(msg[2:])
+
+    def _lost(self, shard: ZoneShard):
+        if shard.alive:
+            print(f"[Server] Zone shard {shard.id} stopped unexpectedly")
+        shard.alive = False
+        for rid, (shard_id, future) in list(self.pending.items()):
+            if shard_id == shard.id:
+                del self.pending[rid]
+                if not future.done():
+                    future.set_result((ZONE_UNAVAILABLE, None))
+
+    # -----------------------------------------------------------
+    # Player routing
+    # -----------------------------------------------------------
+    def place(self, player) -> ZoneShard:
+        """The shard owning the player's position, handing them off if it changed."""
+        owner = self.map.owner(player.x, player.y)
+        current = self.location.get(player.id)
+        shard = self.shards[owner]
+        if current == owner:
+            return shard
+        if current is not None:
+            old = self.shards[current]
+            old.players.discard(player.id)
+            old.moves.pop(player.id, None)
+            old.send(("leave", player.id))
+            if self.metrics:
+                self.metrics.count("zone_handoffs")
+        self.location[player.id] = owner
+        shard.players.add(player.id)
+        shard.send(("enter", player.id, player.serialize()))
+        return shard
+
+    def enter(self, player):
+        self.place(player)
+
+    def leave(self, pid: str):
+        current = self.location.pop(pid, None)
+        if current is not None:
+            shard = self.shards[current]
+            shard.players.discard(pid)
+            shard.moves.pop(pid, None)
+            shard.send(("leave", pid))
+
+    def sync_moves(self, moves: Dict):
+        """Forward one tick of player movement, batched per worker."""
+        players = self.player_manager.players
+        for pid, pos in moves.items():
+            player = players.get(pid)
+            if player is None or pid not in self.location:
+                continue
+            self.place(player).moves[pid] = pos
+        for shard in self.shards:
+            if shard.moves:
+                shard.send(("moves", shard.moves))
+                shard.moves = {}
+
+    # -----------------------------------------------------------
+    # Combat (runs on the worker that owns the player's zone)
+    # -----------------------------------------------------------
+    async def _request(self, player, *msg):
+        shard = self.place(player)
+        rid = next(self._ids)
+        future = self._loop.create_future()
+        self.pending[rid] = (shard.id, future)
+        if not shard.send((msg[0], rid, player.id, player.serialize()) + msg[1:]):
+            self.pending.pop(rid, None)
+            return ZONE_UNAVAILABLE
+        result, changes = await future
+        if changes:
+            # Relative: enemy hits or a respawn may have landed during the await
+            apply_changes(player, changes)
+        return result
+
+    async def attack(self, player) -> dict:
+        return await self._request(player, "attack")
+
+    async def skill(self, player, skill_name=None) -> dict:
+        return await self._request(player, "skill", skill_name)
+
+    def stats(self) -> dict:
+        return {f"zone-{s.id}": {"alive": s.alive, "players": len(s.players)} for s in self.shards}
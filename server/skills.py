@@ -1,8 +1,15 @@
 # ===============================================================
 # Isekai Online - Auto Skill System (class-based + level scaling)
 # ===============================================================
+# Skills are Skill objects in a registry built once at import. Each
+# declares its targeting (single, radius, line or self) and its damage
+# roll, and finds targets through the enemy manager's spatial queries.
+# SkillManager tracks per-player cooldowns and applies a cast's damage
+# in one batch: every hit first, then kills, respawns and XP together.
 
 import random
+import time
+from typing import Dict, List, Tuple
 import sys
 import os
 # Add project root to path
@@ -18,14 +25,104 @@ WARRIOR_SKILL_RANGE = cfg.WARRIOR_SKILL_RANGE
 MAGE_SKILL_RANGE = cfg.MAGE_SKILL_RANGE
 ROGUE_SKILL_RANGE = cfg.ROGUE_SKILL_RANGE
 NINJA_SKILL_RANGE = cfg.NINJA_SKILL_RANGE
+SKILL_COOLDOWNS = cfg.SKILL_COOLDOWNS
+
+# Targeting kinds
+SINGLE = "single"   # nearest enemy within reach
+RADIUS = "radius"   # every enemy within reach of the caster
+LINE = "line"       # every enemy on a segment east of the caster
+SELF = "self"       # the caster only
+
+
+class Skill:
+    """One castable skill: targeting shape, reach and damage roll."""
+
+    def __init__(self, name: str, targeting: str, reach: float = 0, damage=None,
+                 hit_type: str = "hit", reach_per_level: float = 0, width: float = 0):
+        self.name = name
+        self.targeting = targeting
+        self.reach = reach
+        self.reach_per_level = reach_per_level
+        self.width = width                  # LINE half-width
+        self.damage = damage                # lvl -> damage, rolled once per cast
+        self.hit_type = hit_type            # event type sent for each hit
+        self.cooldown = SKILL_COOLDOWNS.get(name, 0.0)
+
+    def targets(self, caster, enemies) -> List[str]:
+        """Ids of the enemies this cast hits, from the shared spatial index."""
+        px, py = caster.x, caster.y
+        reach = self.reach + caster.level * self.reach_per_level
+        if self.targeting == SINGLE:
+            eid = enemies.nearest_enemy(px, py, reach)
+            return [] if eid is None else [eid]
+        if self.targeting == RADIUS:
+            return enemies.enemies_in_radius(px, py, reach)
+        if self.targeting == LINE:
+            return enemies.enemies_on_segment(px, py, px + reach, py, self.width)
+        return []
+
+    def on_hit(self, caster, enemy):
+        """Hook run for each enemy hit, before kills are settled."""
+
+    def cast(self, manager, caster) -> List[dict]:
+        dmg = self.damage(caster.level)
+        hits = [(eid, dmg) for eid in self.targets(caster, manager.mobs)]
+        if not hits:
+            return [{"type": "miss"}]
+        return manager.apply_hits(caster, self, hits)
+
+
+class ShadowStep(Skill):
+    """Single-target strike that blinks the caster behind its target."""
+
+    def on_hit(self, caster, enemy):
+        caster.x, caster.y = enemy.x - 20, enemy.y + 5
+
+
+class HealSkill(Skill):
+    """Restores the caster's hp instead of dealing damage."""
+
+    def cast(self, manager, caster) -> List[dict]:
+        heal = self.damage(caster.level)
+        caster.stats["hp"] = min(caster.stats["max_hp"], caster.stats["hp"] + heal)
+        return [{"type": "heal", "target": caster.id, "amount": heal}]
+
+
+# -----------------------------------------------------------
+# Registry (built once)
+# -----------------------------------------------------------
+SKILLS: Dict[str, Skill] = {s.name: s for s in (
+    # WARRIOR - heavy dmg single target
+    Skill("PowerStrike", SINGLE, WARRIOR_SKILL_RANGE, lambda lvl: random.randint(30, 50) + lvl * 5),
+    # MAGE - area attack around player, grows with level
+    Skill("Fireball", RADIUS, MAGE_SKILL_RANGE, lambda lvl: random.randint(25, 35) + lvl * 3,
+          hit_type="aoe_hit", reach_per_level=5),
+    # PALADIN - heal increases with level
+    HealSkill("HealLight", SELF, damage=lambda lvl: random.randint(40, 60) + lvl * 8),
+    # ROGUE - blink behind nearest target + dmg
+    ShadowStep("ShadowStep", SINGLE, ROGUE_SKILL_RANGE, lambda lvl: 20 + lvl * 4, hit_type="step_hit"),
+    # NINJA - line attack, hits several in row
+    Skill("WindSlash", LINE, NINJA_SKILL_RANGE, lambda lvl: 15 + lvl * 3, hit_type="slash_hit", width=40),
+)}
+
+CLASS_SKILLS = {
+    "warrior": "PowerStrike",
+    "mage": "Fireball",
+    "paladin": "HealLight",
+    "rogue": "ShadowStep",
+    "ninja": "WindSlash",
+}
+DEFAULT_SKILL = "PowerStrike"
 
 
 class SkillManager:
-    """Handles class‑specific skills that scale with level."""
+    """Casts registry skills for players, with per-player cooldowns."""
 
-    def __init__(self, players, mobs):
+    def __init__(self, players, mobs, clock=time.monotonic):
         self.players = players
         self.mobs = mobs
+        self.clock = clock
+        self.ready_at: Dict[str, Dict[str, float]] = {}  # player id -> skill -> time it is ready
 
     # -----------------------------------------------------------
     def use_skill(self, caster_id, skill_name=None):
@@ -37,109 +134,40 @@ class SkillManager:
 
         # auto‑select based on class
         if skill_name is None:
-            cname = caster.class_name.lower()
-            if cname == "warrior":
-                skill_name = "PowerStrike"
-            elif cname == "mage":
-                skill_name = "Fireball"
-            elif cname == "paladin":
-                skill_name = "HealLight"
-            elif cname == "rogue":
-                skill_name = "ShadowStep"
-            elif cname == "ninja":
-                skill_name = "WindSlash"
-            else:
-                skill_name = "PowerStrike"
-
-        px, py = caster.x, caster.y
-        lvl = caster.level
+            skill_name = CLASS_SKILLS.get(caster.class_name.lower(), DEFAULT_SKILL)
+        skill = SKILLS.get(skill_name)
+        if skill is None:
+            return {"skill": skill_name, "events": []}
+
+        now = self.clock()
+        ready = self.ready_at.setdefault(caster_id, {})
+        if ready.get(skill_name, 0.0) > now:
+            return {"skill": skill_name, "events": [
+                {"type": "cooldown", "remaining": round(ready[skill_name] - now, 2)}]}
+        if skill.cooldown:
+            ready[skill_name] = now + skill.cooldown
+
+        return {"skill": skill_name, "events": skill.cast(self, caster)}
+
+    def apply_hits(self, caster, skill: Skill, hits: List[Tuple[str, int]]) -> List[dict]:
+        """Damage every target of one cast, then settle kills and XP in one go."""
+        enemies = self.mobs.enemies
         events = []
-
-        # -----------------------------------------------------------
-        # WARRIOR - PowerStrike: heavy dmg single target
-        # -----------------------------------------------------------
-        if skill_name == "PowerStrike":
-            dmg = random.randint(30, 50) + lvl * 5
-            for mid, mob in list(self.mobs.mobs.items()):
-                dist = ((mob["x"] - px) ** 2 + (mob["y"] - py) ** 2) ** 0.5
-                if dist < WARRIOR_SKILL_RANGE:
-                    mob["hp"] -= dmg
-                    events.append({"type": "hit", "mob": mid, "damage": dmg})
-                    if mob["hp"] <= 0:
-                        caster.add_xp(XP_FROM_SLIME)
-                        self.mobs.remove_mob(mid)
-                        self.mobs.respawn_mob()
-                    break
-            if not events:
-                events.append({"type": "miss"})
-
-        # -----------------------------------------------------------
-        # MAGE - Fireball: area attack around player
-        # -----------------------------------------------------------
-        elif skill_name == "Fireball":
-            radius = MAGE_SKILL_RANGE + lvl * 5
-            base = random.randint(25, 35) + lvl * 3
-            hits = 0
-            for mid, mob in list(self.mobs.mobs.items()):
-                dist = ((mob["x"] - px)**2 + (mob["y"] - py)**2)**0.5
-                if dist < radius:
-                    hits += 1
-                    mob["hp"] -= base
-                    events.append({"type": "aoe_hit", "mob": mid, "damage": base})
-                    if mob["hp"] <= 0:
-                        caster.add_xp(XP_FROM_SLIME)
-                        self.mobs.remove_mob(mid)
-                        self.mobs.respawn_mob()
-            if hits == 0:
-                events.append({"type": "miss"})
-
-        # -----------------------------------------------------------
-        # PALADIN - HealLight: heal increases with level
-        # -----------------------------------------------------------
-        elif skill_name == "HealLight":
-            heal = random.randint(40, 60) + lvl * 8
-            caster.stats["hp"] = min(
-                caster.stats["max_hp"], caster.stats["hp"] + heal)
-            events.append({"type": "heal", "target": caster_id, "amount": heal})
-
-        # -----------------------------------------------------------
-        # ROGUE - ShadowStep: blink behind nearest target + dmg
-        # -----------------------------------------------------------
-        elif skill_name == "ShadowStep":
-            dmg = 20 + lvl * 4
-            for mid, mob in list(self.mobs.mobs.items()):
-                dist = ((mob["x"] - px)**2 + (mob["y"] - py)**2)**0.5
-                if dist < ROGUE_SKILL_RANGE:
-                    mob["hp"] -= dmg
-                    caster.x, caster.y = mob["x"] - 20, mob["y"] + 5
-                    events.append({"type": "step_hit", "mob": mid, "damage": dmg})
-                    if mob["hp"] <= 0:
-                        caster.add_xp(XP_FROM_SLIME)
-                        self.mobs.remove_mob(mid)
-                        self.mobs.respawn_mob()
-                    break
-            if not events:
-                events.append({"type": "miss"})
-
-        # -----------------------------------------------------------
-        # NINJA - WindSlash: line attack, hits several in row
-        # -----------------------------------------------------------
-        elif skill_name == "WindSlash":
-            dmg = 15 + lvl * 3
-            range_x = NINJA_SKILL_RANGE
-            count = 0
-            for mid, mob in list(self.mobs.mobs.items()):
-                if abs(mob["y"] - py) < 40 and 0 < mob["x"] - px < range_x:
-                    mob["hp"] -= dmg
-                    count += 1
-                    events.append({"type": "slash_hit", "mob": mid, "damage": dmg})
-                    if mob["hp"] <= 0:
-                        caster.add_xp(XP_FROM_SLIME)
-                        self.mobs.remove_mob(mid)
-                        self.mobs.respawn_mob()
-            if count == 0:
-                events.append({"type": "miss"})
-
-        # future classes can be appended here
-
-        return {"skill": skill_name, "events": events}
\ No newline at end of file
+        killed = []
+        for mid, dmg in hits:
+            mob = enemies[mid]
+            mob.hp -= dmg
+            self.mobs.mark_dirty(mid, "hp")
+            skill.on_hit(caster, mob)
+            events.append({"type": skill.hit_type, "mob": mid, "damage": dmg})
+            if mob.hp <= 0:
+                killed.append(mid)
+        if killed:
+            for mid in killed:
+                self.mobs.kill_enemy(mid)
+            caster.add_xp(XP_FROM_SLIME * len(killed))
+        return events
+
+    def forget(self, player_id):
+        """Drop the cooldowns of a player who left."""
+        self.ready_at.pop(player_id, None)
@@ -0,0 +1,38 @@
+# ===============================================================
+# Isekai Online - Server Tick Buffer
+# ===============================================================
+# Collects world changes (movement, combat, chat) between two
+# simulation ticks so the server can flush them to clients as one
+# coalesced packet per tick instead of one packet per input.
+
+from typing import Dict, List, Optional, Tuple
+
+
+class TickBuffer:
+    """Accumulates per-tick world changes until the next flush."""
+
+    def __init__(self):
+        self.moves: Dict[str, Tuple[float, float]] = {}  # pid -> latest (x, y)
+        # one-shot packets in order, with the world position they happened at
+        # (None means everyone hears it, e.g. chat)
+        self.events: List[Tuple[dict, Optional[Tuple[float, float]]]] = []
+        self.views_changed = False                       # a player joined or left
+
+    def add_move(self, pid: str, x: float, y: float):
+        """Record a player's position; later moves in the same tick win."""
+        self.moves[pid] = (x, y)
+
+    def add_event(self, packet: dict, pos=None):
+        """Queue a combat / skill / chat packet for the next tick."""
+        self.events.append((packet, pos))
+
+    def is_empty(self) -> bool:
+        return not (self.moves or self.events or self.views_changed)
+
+    def drain(self):
+        """Return (moves, events) and reset the buffer."""
+        moves, events = self.moves, self.events
+        self.moves = {}
+        self.events = []
+        self.views_changed = False
+        return moves, events
@@ -6,6 +6,7 @@
 # - biome functions are imported from shared module
 
 import random
+from functools import lru_cache
 import sys
 import os
 # Add project root to path
@@ -14,7 +15,7 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 import config as cfg
-from shared.biome import get_biome, is_safe_spawn
+from shared.biome import get_biome, region_for_rect
 
 # Config constants
 TILE_SIZE = cfg.TILE_SIZE
@@ -26,14 +27,103 @@ CITY_SPAWN = cfg.CITY_SPAWN
 # ===============================================================
 
 
-def random_spawn_area(xmin=200, xmax=2800, ymin=200, ymax=2800):
-    """Generate a random valid world coordinate (used for mobs)."""
-    for _ in range(80):
-        x, y = random.randint(xmin, xmax), random.randint(ymin, ymax)
-        if is_safe_spawn(x, y):
-            return x, y
-    # fallback if nothing valid after tries
-    return random.randint(xmin, xmax), random.randint(ymin, ymax)
+def random_spawn_area(xmin=200, xmax=2800, ymin=200, ymax=2800, avoid_city=True):
+    """Random open-ground (x, y) as floats, outside the castle unless
+    avoid_city is False (used for mobs).
+
+    Returns None if the area has no open ground at all.
+    """
+    return spawn_table(xmin, ymin, xmax, ymax, avoid_city).pick()
+
+
+# -----------------------------------------------------------
+# Precomputed spawn points
+# -----------------------------------------------------------
+class SpawnTable:
+    """Open ground of a world rectangle, sampled in O(1).
+
+    Every unblocked tile, clipped to the rectangle (and with the castle
+    cut out if asked), becomes one entry of an alias table weighted by
+    its area. pick() is then uniform over open ground for the price of
+    three random draws, instead of rejection sampling that can run out
+    of attempts in water-heavy areas.
+    """
+
+    def __init__(self, x_min, y_min, x_max, y_max, region=None, avoid_city=True):
+        if region is None:
+            region = region_for_rect(x_min, y_min, x_max, y_max)
+        city = (CITY["x"], CITY["y"], CITY["x"] + CITY["w"], CITY["y"] + CITY["h"])
+        rects = []
+        for col, row in region.open_tiles():
+            x0, y0 = max(col * TILE_SIZE, x_min), max(row * TILE_SIZE, y_min)
+            x1, y1 = min((col + 1) * TILE_SIZE, x_max), min((row + 1) * TILE_SIZE, y_max)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            if avoid_city:
+                rects.extend(_subtract((x0, y0, x1, y1), city))
+            else:
+                rects.append((x0, y0, x1, y1))
+        self.rects = rects
+        self.prob, self.alias = _alias_table([(x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects])
+
+    def __len__(self):
+        return len(self.rects)
+
+    def pick(self, rng=random):
+        """Uniform random open point (x, y), or None if there is none."""
+        n = len(self.rects)
+        if not n:
+            return None
+        i = int(rng.random() * n)
+        if rng.random() >= self.prob[i]:
+            i = self.alias[i]
+        x0, y0, x1, y1 = self.rects[i]
+        return rng.uniform(x0, x1), rng.uniform(y0, y1)
+
+
+@lru_cache(maxsize=None)
+def spawn_table(x_min, y_min, x_max, y_max, avoid_city=True) -> SpawnTable:
+    """Shared SpawnTable for a rectangle, built on first use."""
+    return SpawnTable(x_min, y_min, x_max, y_max, avoid_city=avoid_city)
+
+
+def _subtract(rect, hole):
+    """Parts of rect (x0, y0, x1, y1) outside hole, as up to four rects."""
+    x0, y0, x1, y1 = rect
+    hx0, hy0, hx1, hy1 = hole
+    if hx0 >= x1 or hx1 <= x0 or hy0 >= y1 or hy1 <= y0:
+        return [rect]
+    parts = []
+    if y0 < hy0:
+        parts.append((x0, y0, x1, hy0))  # above
+    if hy1 < y1:
+        parts.append((x0, hy1, x1, y1))  # below
+    top, bottom = max(y0, hy0), min(y1, hy1)
+    if x0 < hx0:
+        parts.append((x0, top, hx0, bottom))  # left
+    if hx1 < x1:
+        parts.append((hx1, top, x1, bottom))  # right
+    return parts
+
+
+def _alias_table(weights):
+    """Vose alias table: (prob, alias) lists for O(1) weighted choice."""
+    n = len(weights)
+    total = sum(weights)
+    if not n or total <= 0:
+        return [], []
+    prob = [w * n / total for w in weights]
+    alias = list(range(n))
+    small = [i for i, p in enumerate(prob) if p < 1.0]
+    large = [i for i, p in enumerate(prob) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        alias[s] = l
+        prob[l] -= 1.0 - prob[s]
+        (small if prob[l] < 1.0 else large).append(l)
+    for i in small + large:
+        prob[i] = 1.0  # leftovers are 1 up to rounding
+    return prob, alias
 
 
 # -----------------------------------------------------------
@@ -62,7 +152,11 @@ def get_city_rect():
 if __name__ == "__main__":
     print("Biome test:")
     for i in range(5):
-        x, y = random_spawn_area()
+        pos = random_spawn_area()
+        if pos is None:
+            print("No open ground in the spawn area")
+            break
+        x, y = pos
         print(f"({x},{y}) -> {get_biome(x,y)}, in_city={in_city(x,y)}")
 
     cx, cy, cw, ch = get_city_rect()
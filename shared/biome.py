@@ -3,8 +3,16 @@
 # ===============================================================
 # Provides biome generation functionality without requiring client
 # to import from server code.
+#
+# get_biome() is the analytic source of truth. For speed, the world
+# rectangle is classified once per tile into a BiomeMap (flat byte
+# arrays of biome ids and blocked flags) which every hot path reads
+# instead; points outside the map fall back to the analytic function.
+# biome_region() classifies whole rectangles of tiles in one call,
+# vectorized with NumPy when it is installed.
 
 import math
+import struct
 import sys
 import os
 # Add project root to path
@@ -14,8 +22,23 @@ if root_dir not in sys.path:
 
 import config as cfg
 
+try:
+    import numpy as np
+except ImportError:  # optional: biome_region falls back to pure Python
+    np = None
+
 # Config constant
 TILE_SIZE = cfg.TILE_SIZE
+WORLD_W = cfg.WORLD_W
+WORLD_H = cfg.WORLD_H
+BIOME_CACHE_FILE = cfg.BIOME_CACHE_FILE
+
+# Biome ids stored in the map, index -> name
+BIOMES = ("grass", "sand", "water")
+GRASS, SAND, WATER = 0, 1, 2
+BIOME_IDS = {name: i for i, name in enumerate(BIOMES)}
+
+TREE_CHANCE = 15  # percent of grass tiles with a tree
 
 
 def get_biome(x: float, y: float) -> str:
@@ -29,13 +52,207 @@ def get_biome(x: float, y: float) -> str:
     return "grass"
 
 
+def tree_roll(col: int, row: int) -> bool:
+    """Deterministic per-tile tree roll (trees only grow on grass)."""
+    seed = (col * 73856093) ^ (row * 19349663)
+    return (seed % 100) < TREE_CHANCE
+
+
+# -----------------------------------------------------------
+# Batched region classification
+# -----------------------------------------------------------
+class BiomeRegion:
+    """Biome ids and tree/blocked flags for a rectangle of tiles.
+
+    Arrays are flat, row-major bytearrays of cols * rows entries;
+    tile (col0 + c, row0 + r) lives at index r * cols + c.
+    """
+
+    def __init__(self, col0: int, row0: int, cols: int, rows: int,
+                 biome: bytearray, tree: bytearray, blocked: bytearray):
+        self.col0 = col0
+        self.row0 = row0
+        self.cols = cols
+        self.rows = rows
+        self.biome = biome
+        self.tree = tree
+        self.blocked = blocked
+
+    def index(self, col: int, row: int) -> int:
+        """Flat index of a world tile, or -1 if it is outside the region."""
+        c, r = col - self.col0, row - self.row0
+        if 0 <= c < self.cols and 0 <= r < self.rows:
+            return r * self.cols + c
+        return -1
+
+    def blocked_at(self, x: float, y: float) -> bool:
+        """Blocked flag for the tile under a world point."""
+        i = self.index(int(x // TILE_SIZE), int(y // TILE_SIZE))
+        if i < 0:
+            return is_blocked(x, y)
+        return self.blocked[i] == 1
+
+    def open_tiles(self):
+        """(col, row) of every unblocked tile in the region."""
+        if np is not None:
+            flat = np.flatnonzero(np.frombuffer(bytes(self.blocked), dtype=np.uint8) == 0)
+            cols = (flat % self.cols + self.col0).tolist()
+            rows = (flat // self.cols + self.row0).tolist()
+            return list(zip(cols, rows))
+        return [
+            (self.col0 + i % self.cols, self.row0 + i // self.cols)
+            for i, b in enumerate(self.blocked) if not b
+        ]
+
+
+def _region_numpy(col0, row0, cols, rows):
+    c = np.arange(col0, col0 + cols, dtype=np.int64)
+    r = np.arange(row0, row0 + rows, dtype=np.int64)
+    # The height field is separable: a column term plus a row term
+    sx = c * TILE_SIZE * 0.005
+    sy = r * TILE_SIZE * 0.005
+    h = (np.sin(sx) + 0.5 * np.sin(sx * 3))[None, :] + np.cos(sy)[:, None]
+    biome = np.full(h.shape, GRASS, dtype=np.uint8)
+    biome[h < -0.2] = SAND
+    biome[h < -0.5] = WATER
+    seed = (c * 73856093)[None, :] ^ (r * 19349663)[:, None]
+    tree = ((seed % 100) < TREE_CHANCE) & (biome == GRASS)
+    blocked = tree | (biome == WATER)
+    return BiomeRegion(
+        col0, row0, cols, rows,
+        bytearray(biome.tobytes()),
+        bytearray(tree.astype(np.uint8).tobytes()),
+        bytearray(blocked.astype(np.uint8).tobytes()),
+    )
+
+
+def _region_python(col0, row0, cols, rows):
+    n = cols * rows
+    biome, tree, blocked = bytearray(n), bytearray(n), bytearray(n)
+    i = 0
+    for row in range(row0, row0 + rows):
+        for col in range(col0, col0 + cols):
+            b = BIOME_IDS[get_biome(col * TILE_SIZE, row * TILE_SIZE)]
+            t = b == GRASS and tree_roll(col, row)
+            biome[i] = b
+            tree[i] = t
+            blocked[i] = t or b == WATER
+            i += 1
+    return BiomeRegion(col0, row0, cols, rows, biome, tree, blocked)
+
+
+def biome_region(col0: int, row0: int, cols: int, rows: int) -> BiomeRegion:
+    """Classify a cols x rows block of tiles starting at (col0, row0) in one call."""
+    cols, rows = max(0, cols), max(0, rows)
+    if np is not None:
+        return _region_numpy(col0, row0, cols, rows)
+    return _region_python(col0, row0, cols, rows)
+
+
+def region_for_rect(x_min: float, y_min: float, x_max: float, y_max: float) -> BiomeRegion:
+    """biome_region covering every tile touched by a world rectangle."""
+    col0, row0 = int(x_min // TILE_SIZE), int(y_min // TILE_SIZE)
+    col1, row1 = int(x_max // TILE_SIZE), int(y_max // TILE_SIZE)
+    return biome_region(col0, row0, col1 - col0 + 1, row1 - row0 + 1)
+
+
+# -----------------------------------------------------------
+# Precomputed tile grid
+# -----------------------------------------------------------
+class BiomeMap:
+    """Tile-resolution biome + blocked grid for the world rectangle.
+
+    A tile takes the biome at its top-left corner, which is also what
+    the client draws, so collision, spawning and rendering all agree.
+    """
+
+    MAGIC = b"IOBM"
+    _HEADER = struct.Struct("<4sHII")  # magic, tile size, cols, rows
+
+    def __init__(self, cols: int, rows: int, biome: bytearray, blocked: bytearray):
+        self.cols = cols
+        self.rows = rows
+        self.biome = biome  # row-major biome ids
+        self.blocked = blocked  # row-major 0/1 flags (water or tree)
+
+    @classmethod
+    def build(cls, cols: int, rows: int) -> "BiomeMap":
+        """Classify every tile in one batched region call."""
+        region = biome_region(0, 0, cols, rows)
+        return cls(cols, rows, region.biome, region.blocked)
+
+    # -----------------------------------------------------------
+    # Cache file
+    # -----------------------------------------------------------
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self._HEADER.pack(self.MAGIC, TILE_SIZE, self.cols, self.rows))
+            f.write(self.biome)
+            f.write(self.blocked)
+
+    @classmethod
+    def load(cls, path, cols: int, rows: int):
+        """Read a cache file; None if missing or built for other settings."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        size = cls._HEADER.size
+        if len(data) != size + 2 * cols * rows:
+            return None
+        if cls._HEADER.unpack_from(data) != (cls.MAGIC, TILE_SIZE, cols, rows):
+            return None
+        n = cols * rows
+        return cls(cols, rows, bytearray(data[size:size + n]), bytearray(data[size + n:]))
+
+    @classmethod
+    def load_or_build(cls, cols: int, rows: int, path=None) -> "BiomeMap":
+        if path:
+            cached = cls.load(path, cols, rows)
+            if cached is not None:
+                return cached
+        grid = cls.build(cols, rows)
+        if path:
+            try:
+                grid.save(path)
+            except OSError as e:
+                print(f"[Biome] Could not write cache {path}: {e}")
+        return grid
+
+    # -----------------------------------------------------------
+    # Lookups
+    # -----------------------------------------------------------
+    def tile_biome_id(self, col: int, row: int) -> int:
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return self.biome[row * self.cols + col]
+        return BIOME_IDS[get_biome(col * TILE_SIZE, row * TILE_SIZE)]
+
+    def tile_blocked(self, col: int, row: int) -> bool:
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return self.blocked[row * self.cols + col] == 1
+        b = self.tile_biome_id(col, row)
+        return b == WATER or (b == GRASS and tree_roll(col, row))
+
+
+_map = None
+
+
+def biome_map() -> BiomeMap:
+    """The shared world grid, built (or loaded from cache) on first use."""
+    global _map
+    if _map is None:
+        cols = -(-WORLD_W // TILE_SIZE)
+        rows = -(-WORLD_H // TILE_SIZE)
+        _map = BiomeMap.load_or_build(cols, rows, BIOME_CACHE_FILE)
+    return _map
+
+
+def is_blocked(x: float, y: float) -> bool:
+    """True if the tile under (x, y) is water or a tree."""
+    return biome_map().tile_blocked(int(x // TILE_SIZE), int(y // TILE_SIZE))
+
+
 def is_safe_spawn(x: float, y: float) -> bool:
     """Is the tile valid for spawning mobs / players?"""
-    if get_biome(x, y) == "water":
-        return False
-    col, row = int(x // TILE_SIZE), int(y // TILE_SIZE)
-    seed = (col * 73856093) ^ (row * 19349663)
-    # 15% chance to have trees (block spawn there)
-    if (seed % 100) < 15 and get_biome(col * TILE_SIZE, row * TILE_SIZE) == "grass":
-        return False
-    return True
\ No newline at end of file
+    return not is_blocked(x, y)
@@ -0,0 +1,146 @@
+# ===============================================================
+# Isekai Online - Wire Protocol (JSON + compact binary)
+# ===============================================================
+# Every packet is a dict with a "type" key. JSON text frames work
+# for everything; when both sides agree on the binary codec during
+# the LOGIN/REGISTER handshake, the high-volume position packets go
+# out as small binary frames instead:
+#
+#   MOVE              <B h h>           type, x, y          (5 bytes)
+#   CORRECT_POSITION  <B h h>           type, x, y          (5 bytes)
+#   MOVES             <B H> + n*<4s h h> type, count, (id, x, y)...
+#
+# Coordinates are quantized to int16 and ids are fixed 4-byte ASCII
+# (the server's uuid[:4] ids). Packets that don't fit fall back to JSON.
+
+import json
+import struct
+from enum import IntEnum
+from typing import List, Union
+
+CODEC_JSON = "json"
+CODEC_BINARY = "binary"
+SUPPORTED_CODECS = (CODEC_BINARY, CODEC_JSON)  # preference order
+
+ID_LEN = 4
+INT16_MIN, INT16_MAX = -32768, 32767
+
+_POS = struct.Struct("<Bhh")
+_COUNT = struct.Struct("<BH")
+_ENTRY = struct.Struct("<4shh")
+
+
+class MsgType(IntEnum):
+    """First byte of every binary frame."""
+    MOVE = 1
+    CORRECT_POSITION = 2
+    MOVES = 3
+
+
+class ProtocolError(ValueError):
+    """Raised for frames that cannot be decoded."""
+
+
+def negotiate(offered) -> str:
+    """Pick the first codec from the client's offer that we support."""
+    for codec in offered or ():
+        if codec in SUPPORTED_CODECS:
+            return codec
+    return CODEC_JSON
+
+
+def _quantize(v) -> int:
+    q = int(round(v))
+    if not INT16_MIN <= q <= INT16_MAX:
+        raise OverflowError(v)
+    return q
+
+
+def _pack_id(pid: str) -> bytes:
+    raw = pid.encode("ascii")
+    if len(raw) != ID_LEN:
+        raise ValueError(pid)
+    return raw
+
+
+# -----------------------------------------------------------
+# Encoding
+# -----------------------------------------------------------
+def encode_binary(packet: dict) -> bytes:
+    """Binary frame for a packet; raises if it has no compact form."""
+    t = packet["type"]
+    if t in ("MOVE", "CORRECT_POSITION"):
+        return _POS.pack(MsgType[t], _quantize(packet["x"]), _quantize(packet["y"]))
+    if t == "MOVES":
+        return moves_frame([pack_move(pid, x, y) for pid, (x, y) in packet["moves"].items()])
+    raise ValueError(f"no binary form for {t}")
+
+
+def pack_move(pid: str, x, y) -> bytes:
+    """One (id, x, y) entry of a MOVES frame; raises if it has no compact form."""
+    return _ENTRY.pack(_pack_id(pid), _quantize(x), _quantize(y))
+
+
+def moves_frame(entries: List[bytes]) -> bytes:
+    """MOVES frame from entries already packed with pack_move."""
+    return _COUNT.pack(MsgType.MOVES, len(entries)) + b"".join(entries)
+
+
+def encode(packet: dict, codec: str = CODEC_JSON) -> Union[str, bytes]:
+    """Encode one packet for the wire using the session codec."""
+    if codec == CODEC_BINARY:
+        try:
+            return encode_binary(packet)
+        except (ValueError, OverflowError, UnicodeEncodeError, KeyError):
+            pass
+    return json.dumps(packet)
+
+
+def encode_frames(packet: dict, codec: str = CODEC_JSON) -> List[Union[str, bytes]]:
+    """Encode a packet that may be split into several frames.
+
+    With the binary codec a TICK's player moves travel as a MOVES frame
+    and only the remainder (events, enter/leave, enemies) stays JSON.
+    """
+    if codec == CODEC_BINARY and packet.get("type") == "TICK" and packet.get("moves"):
+        try:
+            moves_frame = encode_binary({"type": "MOVES", "moves": packet["moves"]})
+        except (ValueError, OverflowError, UnicodeEncodeError):
+            return [json.dumps(packet)]
+        rest = {k: v for k, v in packet.items() if k != "moves"}
+        frames = [moves_frame]
+        if len(rest) > 2:  # more than type + tick
+            frames.append(json.dumps(rest))
+        return frames
+    return [encode(packet, codec)]
+
+
+# -----------------------------------------------------------
+# Decoding
+# -----------------------------------------------------------
+def decode(frame: Union[str, bytes]) -> dict:
+    """Decode a websocket frame: text is JSON, bytes are binary."""
+    if isinstance(frame, str):
+        try:
+            return json.loads(frame)
+        except json.JSONDecodeError as e:
+            raise ProtocolError(f"bad JSON: {e}") from e
+    try:
+        t = MsgType(frame[0])
+        if t in (MsgType.MOVE, MsgType.CORRECT_POSITION):
+            _, x, y = _POS.unpack(frame)
+            return {"type": t.name, "x": x, "y": y}
+        if t == MsgType.MOVES:
+            _, count = _COUNT.unpack_from(frame)
+            if len(frame) != _COUNT.size + count * _ENTRY.size:
+                raise ProtocolError("MOVES length mismatch")
+            moves = {}
+            for i in range(count):
+                pid, x, y = _ENTRY.unpack_from(frame, _COUNT.size + i * _ENTRY.size)
+                moves[pid.decode("ascii")] = (x, y)
+            return {"type": "MOVES", "moves": moves}
+    except (IndexError, ValueError, struct.error) as e:
+        if isinstance(e, ProtocolError):
+            raise
+        raise ProtocolError(f"bad binary frame: {e}") from e
+    raise ProtocolError(f"unhandled message type {t}")